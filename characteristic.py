@@ -1,4 +1,4 @@
-from enum import Enum
+from enum import Enum, pickle_by_enum_name
 
 from pkmn_stat_type import StatType
 
@@ -34,6 +34,8 @@ class Characteristic(Enum):
 	def rem(self) -> int:
 		return self.value.rem
 
+	__reduce_ex__ = pickle_by_enum_name
+
 	LOVES_TO_EAT            = CharacteristicData(StatType.HP,    0)
 	PROUD_OF_ITS_POWER      = CharacteristicData(StatType.ATK,   0)
 	STURDY_BODY             = CharacteristicData(StatType.DEF,   0)
@@ -4,12 +4,14 @@ from copy import deepcopy
 from dataclasses import dataclass
 from fractions import Fraction
 from pathlib import Path
-from typing import Iterable, TypeVar, Callable, Optional
+from typing import Iterable, TypeVar, Callable, Optional, Generator
 from typing_extensions import Self
 
 from characteristic import Characteristic
+import ezodf
 import iv_calc
 import iv_calc_ods
+import sinks
 from nature import Nature
 from pkmn_stat import IVRanges, EVs, StatData, StatsData, GenStats, GenStatsNormalized, Stat
 from pkmn_stat_type import StatType, GenStatType
@@ -32,6 +34,9 @@ _Strategy_T = Callable[
 ]
 Strategy_T = Callable[[dict[Sample, GenStats | GenStatsNormalized]], _Strategy_T]
 
+# Sheet for results in the copy of a workbook, see `process_compare_ods`.
+COMPARISON_SHEET_NAME = iv_calc_ods.COMPARISON_SHEET_NAME
+
 
 @dataclass(slots=True)
 class SampleSpecificData:
@@ -83,6 +88,16 @@ class PokemonComparator:
 		else:
 			self._ref_sample = ref_sample
 
+	@property
+	def ref_label(self) -> Optional[str]:
+		"""Nickname or nature of the reference sample, if any."""
+		sample = self._ref_sample
+		if sample is None:
+			return None
+		if sample.nickname is not None:
+			return sample.nickname
+		return None if sample.nature is None else sample.nature.name
+
 	@staticmethod
 	def _sample_evs(_, sample_data: SampleSpecificData, stat_type: StatType) -> IntOrRange_T | None:
 		return sample_data.evs[stat_type]
@@ -466,6 +481,58 @@ def manual_compare():
 	)
 
 
+def _comparison_value(
+	stat_val: IntOrRange_T | FloatRange,
+	relative: bool,
+	mid_values: bool,
+	precision: int
+) -> float | str:
+	if not mid_values:
+		return f'{stat_val:{f".{precision}f" if relative else ".0f"}}'
+
+	mid = float(NumRange.get_mid(stat_val))
+	return round(mid, precision) if relative else mid
+
+
+def _comparison_rows(
+	comp_result: dict[int, GenStats | GenStatsNormalized],
+	ref_stats: Optional[GenStats],
+	samples_iv_sets: list[tuple[iv_calc_ods.ObsSample, iv_calc.CalcedIVSets_T]],
+	filtered_labels: list[tuple[Optional[str], Optional[str]]],
+	mid_values: bool,
+	precision: int
+) -> Generator[list[object]]:
+	"""Rows of the comparison sheet: samples from the best to the worst."""
+	relative = ref_stats is not None
+	yield [
+		"RANK", "LABEL", "POKEMON", "NATURE",
+		*(stat_type.name for stat_type in GenStatType),
+		*(f"{stat_type.name} IV" for stat_type in StatType)
+	]
+
+	for rank, (initial_pos, stats) in enumerate(comp_result.items(), start=1):
+		obs_sample, calced_iv_sets = samples_iv_sets[initial_pos]
+		nature = obs_sample["nature"]
+		yield [
+			rank, obs_sample["label"], obs_sample["spec"].name, None if nature is None else nature.name,
+			*(_comparison_value(stat_val, relative, mid_values, precision) for stat_val in stats.values()),
+			*(iv_calc.get_iv_set_str(calced_iv_sets[stat_type].values) for stat_type in StatType)
+		]
+
+	if ref_stats is not None:
+		yield []
+		yield [
+			"REFERENCE", None, None, None,
+			*(_comparison_value(stat_val, False, mid_values, precision) for stat_val in ref_stats.values())
+		]
+
+	if filtered_labels:
+		yield []
+		yield ["FILTERED", "REFERENCE"]
+		for label, ref_label in filtered_labels:
+			yield [label, ref_label]
+
+
 def process_compare_ods(
 	strategy: Strategy_T,
 	lvl: int,
@@ -479,7 +546,10 @@ def process_compare_ods(
 	spec: Optional[Species_T] = None,
 	evs: Optional[dict[StatType, int]] = None,
 	mid_values: bool = True,
-	precision: int = 2
+	precision: int = 2,
+	output_path: Optional[Path | str] = None,
+	workers: Optional[int] = None,
+	sink: Optional[sinks.Sink] = None
 ) -> None:
 	"""Print comparison of samples from ODS file.
 
@@ -491,6 +561,9 @@ def process_compare_ods(
 
 	If `sheet_name` wasn't specified - all sheets are processed as one.
 
+	`workers` defines how many processes calculate IV sets, check
+	`iv_calc_ods.get_samples_iv_sets`.
+
 	`skip` defines how many first sample should be ignored.
 
 	`limit` defines how many samples have to extracted from the file.
@@ -524,19 +597,29 @@ def process_compare_ods(
 	`mid_values` defines is we should print just mid-values in resulting table.
 
 	`precision` used when `ref_stats` is not None for float rounding.
+
+	============================================================================
+	If `output_path` was provided, nothing is printed: instead, a copy of the
+	file is written there, with samples in order of their rank, their IV sets
+	and filtered labels in the `COMPARISON_SHEET_NAME` sheet.
+
+	Otherwise, if `sink` was provided, the same results are written to it
+	instead of printing, check `sinks`.
 	"""
 	if important_stat_types is not None and not minmax_filter:
 		raise ValueError("Specifying `important_stat_types` makes sense only if `minmax_filter` is True.")
 
-	samples_iv_sets = iv_calc_ods.get_samples_iv_sets(path, sheet_name, skip, limit)
+	samples_iv_sets = iv_calc_ods.get_samples_iv_sets(path, sheet_name, skip, limit, workers=workers)
+	filtered_labels = []
 	if minmax_filter:
 		samples_iv_sets, filtered_labels = iv_calc_ods.minmax_filter_samples_iv_sets(
 			samples_iv_sets,
 			important_stat_types
 		)
-		if filtered_labels:
-			iv_calc_ods.pprint_filtered_labels(filtered_labels)
-		print()
+		if output_path is None and sink is None:
+			if filtered_labels:
+				iv_calc_ods.pprint_filtered_labels(filtered_labels)
+			print()
 	samples_iv_sets = list(samples_iv_sets)
 
 	if evs is None:
@@ -559,7 +642,7 @@ def process_compare_ods(
 				nickname=obs_sample["label"],
 				stats={
 					stat_type: {
-						"iv": IntRange(min(calced_iv_set.values), max(calced_iv_set.values)),
+						"iv": IntRange(calced_iv_set.values.min, calced_iv_set.values.max),
 						"ev": used_evs[stat_type]
 					}
 					for stat_type, calced_iv_set in calced_iv_sets.items()
@@ -572,6 +655,32 @@ def process_compare_ods(
 
 	comp_result, ref_stats = comparator.get_comparison(strategy, lvl)
 
+	if output_path is not None:
+		ezodf.write_sheet(
+			path,
+			output_path,
+			COMPARISON_SHEET_NAME,
+			_comparison_rows(comp_result, ref_stats, samples_iv_sets, filtered_labels, mid_values, precision)
+		)
+		return
+
+	if sink is not None:
+		relative = ref_stats is not None
+		for label, ref_label in filtered_labels:
+			sink.write_filtered(label, ref_label)
+		for rank, (initial_pos, stats) in enumerate(comp_result.items(), start=1):
+			obs_sample, calced_iv_sets = samples_iv_sets[initial_pos]
+			sink.write_ranked(rank, obs_sample, calced_iv_sets, {
+				stat_type: _comparison_value(stat_val, relative, mid_values, precision)
+				for stat_type, stat_val in stats.items()
+			})
+		if ref_stats is not None:
+			sink.write_reference(comparator.ref_label, {
+				stat_type: _comparison_value(stat_val, False, mid_values, precision)
+				for stat_type, stat_val in ref_stats.items()
+			})
+		return
+
 	comparator.pretty_print_results(comp_result, ref_stats,	mid_values,	precision)
 	print()
 
@@ -0,0 +1,103 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+CACHE_DIR = Path("~/.cache/pkmn_py").expanduser()
+# Max number of entries in the cache: the oldest ones are evicted first.
+MAX_ENTRIES = 64
+
+_SUFFIX = ".pickle"
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_key(path: str | Path, *parts: object) -> str:
+    """
+    Build a cache key for the content of a file.
+
+    The key depends on file size, mtime and hash of the content, together
+    with arbitrary `parts` (parser version, sheet name, etc.), which should
+    have stable `repr`.
+
+    Raises:
+        OSError:
+            Unable to read the file.
+    """
+    path = Path(path).expanduser()
+    stat = path.stat()
+
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr((stat.st_size, stat.st_mtime_ns, *parts)).encode())
+    with path.open("rb") as file:
+        while chunk := file.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def key(*parts: object) -> str:
+    """Build a cache key from arbitrary `parts`, which should have stable `repr`."""
+    return hashlib.blake2b(repr(parts).encode(), digest_size=20).hexdigest()
+
+
+def load(key: str, cache_dir: Path = CACHE_DIR) -> Optional[object]:
+    """
+    Load cached value.
+    Returns `None` if there is no such entry or it can't be read.
+    """
+    entry = cache_dir / f"{key}{_SUFFIX}"
+    try:
+        with entry.open("rb") as file:
+            value = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+    try:
+        # Recently used entries should be evicted last.
+        entry.touch()
+    except OSError:
+        pass
+
+    return value
+
+
+def store(key: str, value: object, cache_dir: Path = CACHE_DIR) -> None:
+    """
+    Save value to the cache, evicting the oldest entries if needed.
+    Cache is optional: failure to write it is silently ignored.
+    """
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first, so that other processes never see
+        # partially written entries.
+        fd, tmp_name = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, cache_dir / f"{key}{_SUFFIX}")
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        _evict(cache_dir)
+    except OSError:
+        pass
+
+
+def _evict(cache_dir: Path) -> None:
+    entries = []
+    for entry in cache_dir.glob(f"*{_SUFFIX}"):
+        try:
+            entries.append((entry.stat().st_mtime_ns, entry))
+        except OSError:
+            # Removed by someone else.
+            continue
+
+    if len(entries) <= MAX_ENTRIES:
+        return
+
+    entries.sort()
+    for _, entry in entries[:len(entries) - MAX_ENTRIES]:
+        entry.unlink(missing_ok=True)
@@ -1,7 +1,17 @@
-from dataclasses import dataclass
+import io
+import os
+import shutil
+import tempfile
+from array import array
+from bisect import bisect_right
+from collections.abc import Container, Generator, Iterable, Iterator, Mapping, Sequence, ValuesView
+from dataclasses import dataclass, field
 from pathlib import Path
-from zipfile import BadZipFile, ZipFile
+from typing import IO, Optional
+from zipfile import BadZipFile, ZipFile, ZipInfo, ZIP_DEFLATED
 from xml.etree import ElementTree
+from xml.parsers import expat
+from xml.sax.saxutils import escape, quoteattr
 
 
 _NS = {
@@ -10,6 +20,21 @@ _NS = {
     "text": "urn:oasis:names:tc:opendocument:xmlns:text:1.0",
 }
 
+_BODY_TAG = f"{{{_NS['office']}}}body"
+_SPREADSHEET_TAG = f"{{{_NS['office']}}}spreadsheet"
+_TABLE_TAG = f"{{{_NS['table']}}}table"
+_ROW_TAG = f"{{{_NS['table']}}}table-row"
+_CELL_TAG = f"{{{_NS['table']}}}table-cell"
+_COVERED_CELL_TAG = f"{{{_NS['table']}}}covered-table-cell"
+_PARAGRAPH_TAG = f"{{{_NS['text']}}}p"
+
+_VALUE_TYPE_ATTR = f"{{{_NS['office']}}}value-type"
+_VALUE_ATTR = f"{{{_NS['office']}}}value"
+_BOOLEAN_VALUE_ATTR = f"{{{_NS['office']}}}boolean-value"
+_COLUMNS_SPANNED_ATTR = f"{{{_NS['table']}}}number-columns-spanned"
+_ROWS_SPANNED_ATTR = f"{{{_NS['table']}}}number-rows-spanned"
+_COLUMNS_REPEATED_ATTR = f"{{{_NS['table']}}}number-columns-repeated"
+
 
 @dataclass(frozen=True)
 class Cell:
@@ -17,157 +42,649 @@ class Cell:
     span: tuple[int, int]  # (columns, rows)
 
 
+_NO_SPAN = (1, 1)
+_EMPTY_CELL = Cell(None, _NO_SPAN)
+
+# Kinds of stored cell values, see `_Row`.
+_EMPTY, _INT, _BOOL, _STR, _OBJECT = range(5)
+_INT_RANGE = range(-2 ** 63, 2 ** 63)
+# Integers with at most that many characters are exactly representable as
+# floats, so parsing them with `int` gives the same result as with `float`.
+_MAX_EXACT_INT_LEN = 15
+# Empty string always has this index in `_ValuePool.strings`.
+_EMPTY_STRING_ID = 0
+
+
+class _ValuePool:
+    """
+    Values shared by all rows parsed in one pass over a document.
+
+    Strings are interned: every distinct string is stored once and cells
+    refer to it by index. Values that don't fit into a 64-bit integer
+    (non-integer floats, huge integers) are stored as objects.
+    """
+    __slots__ = "strings", "_string_ids", "objects"
+
+    def __init__(self):
+        self.strings: list[str] = [""]
+        self._string_ids: dict[str, int] = {"": _EMPTY_STRING_ID}
+        self.objects: list[object] = []
+
+    def add_string(self, value: str) -> int:
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self.strings)
+            self.strings.append(value)
+
+        return string_id
+
+    def add_object(self, value: object) -> int:
+        self.objects.append(value)
+        return len(self.objects) - 1
+
+
+class _Row:
+    """
+    Row stored as runs of repeated cells in typed arrays.
+
+    Run `i` covers columns [starts[i], starts[i + 1]) (up to `width` for the
+    last one). Its value is encoded by `kinds[i]` and `values[i]`: integer
+    value, boolean, or index in `_ValuePool` for strings and other objects.
+    Spans are kept only for merged cells, by run index.
+    """
+    __slots__ = "starts", "kinds", "values", "spans", "width", "used_width"
+
+    def __init__(self):
+        self.starts = array("q")
+        self.kinds = array("b")
+        self.values = array("q")
+        self.spans: Optional[dict[int, tuple[int, int]]] = None
+        self.width = 0
+        # Number of columns up to the last one with a value.
+        self.used_width = 0
+
+    def append(self, kind: int, encoded: int, span: tuple[int, int], repeat: int) -> None:
+        """Append a run of `repeat` equal cells with already encoded value."""
+        if span != _NO_SPAN:
+            if self.spans is None:
+                self.spans = {}
+            self.spans[len(self.starts)] = span
+
+        self.starts.append(self.width)
+        self.kinds.append(kind)
+        self.values.append(encoded)
+        self.width += repeat
+        if kind != _EMPTY and not (kind == _STR and encoded == _EMPTY_STRING_ID):
+            self.used_width = self.width
+
+    def _value(self, i: int, pool: _ValuePool) -> object:
+        kind = self.kinds[i]
+        if kind == _INT:
+            return self.values[i]
+        if kind == _STR:
+            return pool.strings[self.values[i]]
+        if kind == _EMPTY:
+            return None
+        if kind == _BOOL:
+            return bool(self.values[i])
+        return pool.objects[self.values[i]]
+
+    def _cell(self, i: int, pool: _ValuePool) -> Cell:
+        value = self._value(i, pool)
+        span = _NO_SPAN if self.spans is None else self.spans.get(i, _NO_SPAN)
+        if value is None and span == _NO_SPAN:
+            return _EMPTY_CELL
+
+        return Cell(value, span)
+
+    def cell(self, col: int, pool: _ValuePool) -> Cell:
+        if col >= self.width:
+            return _EMPTY_CELL
+
+        return self._cell(bisect_right(self.starts, col) - 1, pool)
+
+    def value(self, col: int, pool: _ValuePool) -> object:
+        if col >= self.width:
+            return None
+
+        return self._value(bisect_right(self.starts, col) - 1, pool)
+
+    def expand(self, pool: _ValuePool) -> list[Cell]:
+        """Return all cells of the row, except trailing empty ones."""
+        used = len(self.starts)
+        while used and self._cell(used - 1, pool) is _EMPTY_CELL:
+            used -= 1
+
+        row: list[Cell] = []
+        for i in range(used):
+            end = self.starts[i + 1] if i + 1 < len(self.starts) else self.width
+            cell = self._cell(i, pool)
+            row.extend(cell for _ in range(end - self.starts[i]))
+
+        return row
+
+
 @dataclass
 class Sheet:
     name: str
-    _cells: list[list[Cell]]
+    # Repeated rows are stored once: run `i` covers rows
+    # [_row_starts[i], _row_starts[i + 1]) (up to `_nrows` for the last one).
+    _row_starts: array
+    _rows: list[_Row]
+    _nrows: int
+    # Width of the widest row, narrower rows are padded with empty cells.
+    _ncols: int
+    # Rows with at least one cell with a value, as sorted runs: run `i`
+    # covers rows [_used_row_starts[i], _used_row_ends[i]).
+    _used_row_starts: array = field(default_factory=lambda: array("q"))
+    _used_row_ends: array = field(default_factory=lambda: array("q"))
+    # Number of columns up to the last one with a value.
+    _used_ncols: int = 0
+    _pool: _ValuePool = field(default_factory=_ValuePool)
 
     def nrows(self) -> int:
-        return len(self._cells)
+        return self._nrows
 
     def ncols(self) -> int:
-        if not self._cells:
-            return 0
-        return len(self._cells[0])
+        return self._ncols
+
+    def used_ncols(self) -> int:
+        """Number of columns up to the last one with a value in any row."""
+        return self._used_ncols
+
+    def row_is_empty(self, row: int) -> bool:
+        """Return True iff no cell in the row has a value."""
+        if row < 0:
+            raise IndexError(f"negative indices are not supported: {row}")
+
+        i = bisect_right(self._used_row_starts, row) - 1
+        return i < 0 or row >= self._used_row_ends[i]
+
+    def next_used_row(self, start_row: int = 0) -> Optional[int]:
+        """
+        Return the first row at or after `start_row` which has at least
+        one cell with a value, or None if there are no such rows.
+        """
+        if start_row < 0:
+            raise IndexError(f"negative indices are not supported: {start_row}")
+
+        i = bisect_right(self._used_row_starts, start_row) - 1
+        if i >= 0 and start_row < self._used_row_ends[i]:
+            return start_row
+
+        if i + 1 < len(self._used_row_starts):
+            return self._used_row_starts[i + 1]
+
+        return None
 
     def __getitem__(self, pos: tuple[int, int]) -> Cell:
         row, col = pos
         if row < 0 or col < 0:
             raise IndexError(f"negative indices are not supported: ({row}, {col})")
 
-        return self._cells[row][col]
+        if row >= self._nrows or col >= self._ncols:
+            raise IndexError(f"cell index out of range: ({row}, {col})")
+
+        return self._rows[bisect_right(self._row_starts, row) - 1].cell(col, self._pool)
+
+    def region(self, row: int, col: int, nrows: int, ncols: int) -> list[list[object]]:
+        """
+        Return values (not cells) of a rectangular region in one call:
+        `nrows` lists of `ncols` values, starting from (`row`, `col`).
+        """
+        if row < 0 or col < 0:
+            raise IndexError(f"negative indices are not supported: ({row}, {col})")
+
+        if row + nrows > self._nrows or col + ncols > self._ncols:
+            raise IndexError(f"region out of range: ({row}, {col}) + {nrows}×{ncols}")
+
+        pool = self._pool
+        values: list[list[object]] = []
+        for r in range(row, row + nrows):
+            sheet_row = self._rows[bisect_right(self._row_starts, r) - 1]
+            values.append([
+                sheet_row.value(c, pool)
+                for c in range(col, col + ncols)
+            ])
+
+        return values
 
 
 @dataclass
 class Document:
     # sheet_name: sheet_content
-    sheets: dict[str, Sheet]
+    sheets: Mapping[str, Sheet]
 
 
-def _parse_cell_element(cell_element: ElementTree.Element) -> Cell:
+def _parse_string(cell_element: ElementTree.Element) -> str:
+    paragraphs = [
+        child
+        for child in cell_element
+        if child.tag == _PARAGRAPH_TAG
+    ]
+
+    if len(paragraphs) == 1 and not len(paragraphs[0]):
+        # Plain single-line text: the most common case.
+        return paragraphs[0].text or ""
+
+    return "\n".join(
+        "".join(paragraph.itertext())
+        for paragraph in paragraphs
+    )
+
+
+def _encode_float(float_value: str, pool: _ValuePool) -> tuple[int, int]:
+    if len(float_value) <= _MAX_EXACT_INT_LEN:
+        try:
+            # Most of the values are integers: no need to go through `float`.
+            return _INT, int(float_value)
+        except ValueError:
+            pass
+
+    value = float(float_value)
+    if value.is_integer() and (int_value := int(value)) in _INT_RANGE:
+        return _INT, int_value
+
+    if value.is_integer():
+        return _OBJECT, pool.add_object(int(value))
+
+    return _OBJECT, pool.add_object(value)
+
+
+def _parse_cell_element(
+    cell_element: ElementTree.Element,
+    pool: _ValuePool,
+) -> tuple[int, int, tuple[int, int]]:
     """
     Parse a <table:table-cell> element.
+
+    Returns kind and encoded value of the cell (see `_Row`), and its span.
+    Strings are interned in `pool`.
     """
-    value_type = cell_element.get(f"{{{_NS['office']}}}value-type")
+    attrib = cell_element.attrib
+    value_type = attrib.get(_VALUE_TYPE_ATTR)
 
     if value_type is None:
-        value = None
-
-    elif value_type == "string":
-        paragraphs = cell_element.findall("text:p", _NS)
-        value = "\n".join(
-            "".join(paragraph.itertext())
-            for paragraph in paragraphs
-        )
+        kind, encoded = _EMPTY, 0
 
     elif value_type == "float":
-        float_value = cell_element.get(f"{{{_NS['office']}}}value")
+        float_value = attrib.get(_VALUE_ATTR)
         if float_value is None:
             raise ValueError("float cell without office:value")
 
-        value = float(float_value)
-        if value.is_integer():
-            value = int(value)
+        kind, encoded = _encode_float(float_value, pool)
+
+    elif value_type == "string":
+        kind, encoded = _STR, pool.add_string(_parse_string(cell_element))
 
     elif value_type == "boolean":
-        boolean_value = cell_element.get(f"{{{_NS['office']}}}boolean-value")
+        boolean_value = attrib.get(_BOOLEAN_VALUE_ATTR)
         if boolean_value is None:
             raise ValueError("boolean cell without office:boolean-value")
 
-        value = boolean_value == "true"
+        kind, encoded = _BOOL, int(boolean_value == "true")
 
     else:
         raise ValueError(f"unsupported cell value type: {value_type!r}")
 
-    col_span = int(
-        cell_element.get(
-            f"{{{_NS['table']}}}number-columns-spanned",
-            "1",
+    if _COLUMNS_SPANNED_ATTR in attrib or _ROWS_SPANNED_ATTR in attrib:
+        span = (
+            int(attrib.get(_COLUMNS_SPANNED_ATTR, "1")),
+            int(attrib.get(_ROWS_SPANNED_ATTR, "1")),
         )
-    )
+    else:
+        span = _NO_SPAN
+
+    return kind, encoded, span
+
+
+def _parse_row_element(row_element: ElementTree.Element, pool: _ValuePool) -> _Row:
+    """
+    Parse a <table:table-row> element.
+    Repeated cells are kept as runs, see `_Row`.
+    """
+    row = _Row()
+
+    for cell_element in row_element:
+        tag = cell_element.tag
+        if tag == _CELL_TAG:
+            kind, encoded, span = _parse_cell_element(cell_element, pool)
+        elif tag == _COVERED_CELL_TAG:
+            kind, encoded, span = _EMPTY, 0, _NO_SPAN
+        else:
+            continue
+
+        repeat = int(cell_element.get(_COLUMNS_REPEATED_ATTR, "1"))
+
+        row.append(kind, encoded, span, repeat)
+
+    return row
 
-    row_span = int(
-        cell_element.get(
-            f"{{{_NS['table']}}}number-rows-spanned",
+
+def _row_repeat(row_element: ElementTree.Element) -> int:
+    return int(
+        row_element.get(
+            f"{{{_NS['table']}}}number-rows-repeated",
             "1",
         )
     )
 
-    return Cell(
-        value=value,
-        span=(col_span, row_span),
-    )
 
+def _iterparse_tables(
+    content: IO[bytes],
+    pool: _ValuePool,
+    sheet_names: Optional[Container[str]] = None,
+) -> Generator[tuple[str, Optional[_Row], int]]:
+    """
+    Stream <table:table> elements of a content.xml document.
+
+    For every table yields (name, None, 0) first, and then
+    (name, row, repeat) for each of its <table:table-row> elements.
+    Rows are parsed only for tables from `sheet_names` (`None` for "all
+    tables"), other tables are just skipped. Values of parsed rows
+    are stored in `pool`.
+
+    Finished elements are detached from the tree as soon as they are
+    processed, so memory use doesn't grow with the size of the document.
 
-def _parse_row_element(row_element: ElementTree.Element) -> list[Cell]:
+    Raises:
+        ValueError:
+            The stream is not a valid ODS content.xml.
     """
-    Parse a <table:table-row> element.
+    # Currently open elements, from the root down.
+    path: list[ElementTree.Element] = []
+    table: Optional[ElementTree.Element] = None
+    name: Optional[str] = None
+    wanted = False
+    has_body = has_spreadsheet = False
+
+    for event, element in ElementTree.iterparse(content, events=("start", "end")):
+        if event == "start":
+            path.append(element)
+            depth = len(path)
+            if depth > 4:
+                continue
+
+            if depth == 2 and element.tag == _BODY_TAG:
+                has_body = True
+            elif depth == 3 and element.tag == _SPREADSHEET_TAG and path[1].tag == _BODY_TAG:
+                has_spreadsheet = True
+            elif depth == 4 and element.tag == _TABLE_TAG and path[2].tag == _SPREADSHEET_TAG and path[1].tag == _BODY_TAG:
+                name = element.get(f"{{{_NS['table']}}}name")
+                if not name:
+                    raise ValueError("table without a name")
+                table = element
+                wanted = sheet_names is None or name in sheet_names
+                yield name, None, 0
+            continue
+
+        path.pop()
+        # Parser may be ahead of us, so the finished element is not
+        # necessarily the last child of its parent.
+        if len(path) > 4:
+            # Cells have to stay attached until their row is parsed. Rows
+            # nested deeper than in the table itself are ignored.
+            if element.tag == _ROW_TAG:
+                path[-1].remove(element)
+            continue
+
+        if element is table:
+            table = None
+        elif element.tag == _ROW_TAG and wanted and path[-1] is table:
+            yield name, _parse_row_element(element, pool), _row_repeat(element)
+
+        # Not needed anymore.
+        if path:
+            path[-1].remove(element)
+
+    if not has_body:
+        raise ValueError("content.xml does not contain office:body")
+
+    if not has_spreadsheet:
+        raise ValueError("content.xml does not contain office:spreadsheet")
+
+
+# (size, modification time in ns) of a file.
+_Stamp_T = tuple[int, int]
+
+
+def _get_stamp(file: IO[bytes]) -> _Stamp_T:
+    stat = os.fstat(file.fileno())
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _iterparse_document(
+    path: Path,
+    pool: _ValuePool,
+    sheet_names: Optional[Container[str]] = None,
+    stamp: Optional[_Stamp_T] = None,
+) -> Generator[tuple[str, Optional[_Row], int]]:
     """
-    row: list[Cell] = []
+    Stream tables of an ODS document, see `_iterparse_tables`.
+    If `stamp` is given, the file must still have it.
 
-    for cell_element in row_element:
-        if cell_element.tag not in {
-            f"{{{_NS['table']}}}table-cell",
-            f"{{{_NS['table']}}}covered-table-cell",
-        }:
+    Raises:
+        OSError:
+            Unable to read the file, or the file has changed.
+
+        ValueError:
+            The file is not a valid ODS document.
+    """
+    try:
+        with open(path, "rb") as file:
+            if stamp is not None and _get_stamp(file) != stamp:
+                raise OSError(f"{path!s} has changed since it was opened")
+
+            with ZipFile(file) as archive:
+                try:
+                    content = archive.open("content.xml")
+                except KeyError as exc:
+                    raise ValueError("ODS archive does not contain content.xml") from exc
+
+                with content:
+                    yield from _iterparse_tables(content, pool, sheet_names)
+    except BadZipFile as exc:
+        raise ValueError(f"{path!s} is not a valid ODS file") from exc
+    except ElementTree.ParseError as exc:
+        raise ValueError(f"content.xml is not a valid XML: {exc}") from exc
+
+
+def iter_rows(
+    path: str | Path,
+    sheet_name: Optional[str] = None,
+) -> Generator[tuple[str, int, list[Cell], int]]:
+    """
+    Stream rows of an ODS document without building the whole tree.
+
+    Args:
+        path:
+            Path to an .ods file.
+        sheet_name:
+            Specific sheet to stream. `None` for "all sheets".
+
+    Yields:
+        (sheet_name, row, cells, repeat) for every row of the document:
+        `cells` occupy `repeat` rows starting from zero-based `row`.
+        Trailing empty cells are omitted.
+
+    Raises:
+        OSError:
+            Unable to read the file.
+
+        ValueError:
+            The file is not a valid ODS document.
+    """
+    path = Path(path).expanduser()
+
+    sheet_names = None if sheet_name is None else {sheet_name}
+
+    pool = _ValuePool()
+    row_index = 0
+    for name, row, repeat in _iterparse_document(path, pool, sheet_names):
+        if row is None:
+            row_index = 0
             continue
 
-        if cell_element.tag == f"{{{_NS['table']}}}covered-table-cell":
-            cell = Cell(None, (1, 1))
-        else:
-            cell = _parse_cell_element(cell_element)
+        yield name, row_index, row.expand(pool), repeat
+        row_index += repeat
 
-        repeat = int(
-            cell_element.get(
-                f"{{{_NS['table']}}}number-columns-repeated",
-                "1",
-            )
-        )
 
-        row.extend(cell for _ in range(repeat))
+def _iter_sheets(
+    path: Path,
+    sheet_names: Optional[Container[str]] = None,
+    stamp: Optional[_Stamp_T] = None,
+    seen_names: Optional[list[str]] = None,
+) -> Generator[Sheet]:
+    """
+    Parse sheets of an ODS document one by one.
+    Only sheets from `sheet_names` are parsed, `None` for "all sheets".
+    Names of all sheets met so far, parsed or not, are added to `seen_names`:
+    a yielded sheet is always the last one there.
+    """
+    pool = _ValuePool()
+    sheet: Optional[Sheet] = None
 
-    return row
+    for name, row, repeat in _iterparse_document(path, pool, sheet_names, stamp):
+        if row is None:
+            if sheet is not None:
+                yield sheet
+
+            if seen_names is not None:
+                seen_names.append(name)
+
+            if sheet_names is None or name in sheet_names:
+                sheet = Sheet(name, array("q"), [], 0, 0, _pool=pool)
+            else:
+                sheet = None
+            continue
+
+        if row.used_width:
+            if sheet._used_row_ends and sheet._used_row_ends[-1] == sheet._nrows:
+                # Continues the last run.
+                sheet._used_row_ends[-1] = sheet._nrows + repeat
+            else:
+                sheet._used_row_starts.append(sheet._nrows)
+                sheet._used_row_ends.append(sheet._nrows + repeat)
+            sheet._used_ncols = max(sheet._used_ncols, row.used_width)
+
+        sheet._row_starts.append(sheet._nrows)
+        sheet._rows.append(row)
+        sheet._nrows += repeat
+        sheet._ncols = max(sheet._ncols, row.width)
+
+    if sheet is not None:
+        yield sheet
+
+
+class _Unparsed(Container[str]):
+    """Names of sheets which are not parsed yet."""
 
+    def __init__(self, sheets: Mapping[str, Sheet]):
+        self._sheets = sheets
 
-def _parse_sheet_element(table: ElementTree.Element) -> tuple[str, Sheet]:
+    def __contains__(self, name: object) -> bool:
+        return name not in self._sheets
+
+
+class _LazySheets(Mapping[str, Sheet]):
     """
-    Parse a <table:table> element.
-    Returns name and content.
+    Sheets of an ODS document, parsed on first access.
+
+    Accessing one sheet reads the document only up to the end of that sheet,
+    skipping other sheets without parsing their cells. Iterating over values
+    parses all sheets which are not parsed yet in one pass, yielding each one
+    as soon as it is parsed. Names are known after any pass through the whole
+    document, otherwise iterating over them takes one pass that doesn't parse
+    any cells at all.
+
+    The file is expected to stay as it was when the document was opened:
+    every pass fails with `OSError` otherwise, so sheets of different versions
+    of the file are never mixed.
     """
-    name = table.get(f"{{{_NS['table']}}}name")
-    if not name:
-        raise ValueError("table without a name")
 
-    rows: list[list[Cell]] = []
+    def __init__(self, path: Path, stamp: _Stamp_T):
+        self._path = path
+        self._stamp = stamp
+        self._names: Optional[list[str]] = None
+        self._sheets: dict[str, Sheet] = {}
 
-    for row_element in table.findall("table:table-row", _NS):
-        row = _parse_row_element(row_element)
+    def _index(self) -> list[str]:
+        if self._names is None:
+            self._names = [
+                name
+                for name, _, _ in _iterparse_document(self._path, _ValuePool(), (), self._stamp)
+            ]
 
-        repeat = int(
-            row_element.get(
-                f"{{{_NS['table']}}}number-rows-repeated",
-                "1",
-            )
-        )
+        return self._names
+
+    def _iter_values(self) -> Generator[Sheet]:
+        if self._names is not None and len(self._sheets) == len(self._names):
+            yield from (self._sheets[name] for name in self._names)
+            return
+
+        seen_names: list[str] = []
+        # Number of seen sheets which are already yielded.
+        done = 0
+        for sheet in _iter_sheets(self._path, _Unparsed(self._sheets), self._stamp, seen_names):
+            self._sheets[sheet.name] = sheet
+            # Sheets between the previous one and this one were parsed before.
+            yield from (self._sheets[name] for name in seen_names[done:-1])
+            yield sheet
+            done = len(seen_names)
+
+        self._names = seen_names
+        yield from (self._sheets[name] for name in seen_names[done:])
+
+    def __getitem__(self, name: str) -> Sheet:
+        if name not in self._sheets:
+            if self._names is not None and name not in self._names:
+                raise KeyError(name)
+
+            seen_names: list[str] = []
+            for sheet in _iter_sheets(self._path, {name}, self._stamp, seen_names):
+                self._sheets[name] = sheet
+                # No need to read the rest of the document.
+                break
+            else:
+                self._names = seen_names
+                raise KeyError(name)
+
+        return self._sheets[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index())
+
+    def __len__(self) -> int:
+        return len(self._index())
 
-        for _ in range(repeat):
-            rows.append(list(row))
+    def __contains__(self, name: object) -> bool:
+        return name in self._sheets or name in self._index()
 
-    width = max((len(row) for row in rows), default=0)
+    def values(self) -> ValuesView[Sheet]:
+        return _LazySheetValues(self)
 
-    for row in rows:
-        if len(row) < width:
-            row.extend(
-                Cell(None, (1, 1))
-                for _ in range(width - len(row))
-            )
 
-    return name, Sheet(name=name, _cells=rows)
+class _LazySheetValues(ValuesView[Sheet]):
+    _mapping: _LazySheets
+
+    def __iter__(self) -> Iterator[Sheet]:
+        return self._mapping._iter_values()
+
+    def __len__(self) -> int:
+        # E.g. `list()` asks for the length first: parse sheets right away
+        # instead of making a separate pass just for names.
+        if self._mapping._names is None:
+            for _ in self:
+                pass
+
+        return len(self._mapping)
 
 
 def opendoc(path: str | Path) -> Document:
     """
     Open an ODS document.
+    Sheets are parsed lazily, on first access, see `_LazySheets`: accessing
+    them raises the same errors.
 
     Args:
         path:
@@ -185,31 +702,266 @@ def opendoc(path: str | Path) -> Document:
     """
     path = Path(path).expanduser()
 
+    # Fail early on files that are not ODS documents at all, sheets are
+    # parsed on access.
     try:
-        with ZipFile(path) as archive:
-            try:
-                content = archive.read("content.xml")
-            except KeyError as exc:
-                raise ValueError("ODS archive does not contain content.xml") from exc
+        with open(path, "rb") as file, ZipFile(file) as archive:
+            stamp = _get_stamp(file)
+            if "content.xml" not in archive.namelist():
+                raise ValueError("ODS archive does not contain content.xml")
     except BadZipFile as exc:
         raise ValueError(f"{path!s} is not a valid ODS file") from exc
 
-    root = ElementTree.fromstring(content)
+    sheets = _LazySheets(path, stamp)
 
-    body = root.find("office:body", _NS)
-    if body is None:
-        raise ValueError("content.xml does not contain office:body")
+    return Document(sheets)
 
-    spreadsheet = body.find("office:spreadsheet", _NS)
-    if spreadsheet is None:
-        raise ValueError("content.xml does not contain office:spreadsheet")
 
-    sheets = dict(
-        _parse_sheet_element(table)
-        for table in spreadsheet.findall("table:table", _NS)
-    )
+class _ContentRewriter:
+    """
+    Copy content.xml from one stream to another, event by event, replacing
+    (or adding) one table with rows generated on the fly.
 
-    return Document(sheets)
+    Namespace processing is off, so names are written exactly as they were
+    read, prefixes included.
+    """
+
+    def __init__(self, out: IO[str], sheet_name: str, rows: Iterable[Sequence[object]]):
+        self._out = out
+        self._sheet_name = sheet_name
+        self._rows = rows
+        # Prefixes used in the document, by namespace key from `_NS`.
+        self._prefixes: dict[str, str] = {}
+        # Element names, from the root down to the current one.
+        self._path: list[str] = []
+        # Start tag is written without closing ">" until we know whether
+        # the element is empty.
+        self._open_tag = False
+        # Depth of the skipped (replaced) table, if we are inside it.
+        self._skip_depth: Optional[int] = None
+        self._tables_seen = False
+        self._written = False
+
+        self._parser = expat.ParserCreate()
+        self._parser.ordered_attributes = True
+        self._parser.buffer_text = True
+        self._parser.StartElementHandler = self._start
+        self._parser.EndElementHandler = self._end
+        self._parser.CharacterDataHandler = self._text
+        self._parser.CommentHandler = self._comment
+        self._parser.ProcessingInstructionHandler = self._processing_instruction
+
+    def rewrite(self, content: IO[bytes]) -> None:
+        self._out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        try:
+            self._parser.ParseFile(content)
+        except expat.ExpatError as exc:
+            raise ValueError(f"content.xml is not a valid XML: {exc}") from exc
+
+        if not self._written:
+            raise ValueError("content.xml does not contain office:spreadsheet")
+
+    def _name(self, prefix: str, local_name: str) -> str:
+        return f"{self._prefixes[prefix]}:{local_name}"
+
+    def _close_open_tag(self) -> None:
+        if self._open_tag:
+            self._out.write(">")
+            self._open_tag = False
+
+    def _write_start(self, name: str, attrs: list[str]) -> None:
+        self._close_open_tag()
+        self._out.write(f"<{name}")
+        for i in range(0, len(attrs), 2):
+            self._out.write(f" {attrs[i]}={quoteattr(attrs[i + 1])}")
+        self._open_tag = True
+
+    def _start(self, name: str, attrs: list[str]) -> None:
+        self._path.append(name)
+        depth = len(self._path)
+
+        if depth == 1:
+            for i in range(0, len(attrs), 2):
+                if attrs[i].startswith("xmlns:"):
+                    for key, uri in _NS.items():
+                        if attrs[i + 1] == uri:
+                            self._prefixes.setdefault(key, attrs[i].removeprefix("xmlns:"))
+            missing = _NS.keys() - self._prefixes.keys()
+            if missing:
+                raise ValueError(f"content.xml does not declare namespaces: {', '.join(sorted(missing))}")
+
+        if self._skip_depth is not None:
+            return
+
+        if depth == 4 and self._path[1:3] == [self._name("office", "body"), self._name("office", "spreadsheet")]:
+            if name == self._name("table", "table"):
+                self._tables_seen = True
+                if _attr(attrs, self._name("table", "name")) == self._sheet_name:
+                    # Replace the table in place.
+                    if not self._written:
+                        self._write_table()
+                    self._skip_depth = depth
+                    return
+            elif self._tables_seen and not self._written:
+                # New table goes right after the existing ones.
+                self._write_table()
+
+        self._write_start(name, attrs)
+
+    def _end(self, name: str) -> None:
+        depth = len(self._path)
+        self._path.pop()
+
+        if self._skip_depth is not None:
+            if depth == self._skip_depth:
+                self._skip_depth = None
+            return
+
+        if (
+            depth == 3
+            and name == self._name("office", "spreadsheet")
+            and self._path[1] == self._name("office", "body")
+            and not self._written
+        ):
+            self._write_table()
+
+        if self._open_tag:
+            self._out.write("/>")
+            self._open_tag = False
+        else:
+            self._out.write(f"</{name}>")
+
+    def _text(self, data: str) -> None:
+        if self._skip_depth is None:
+            self._close_open_tag()
+            self._out.write(escape(data))
+
+    def _comment(self, data: str) -> None:
+        if self._skip_depth is None:
+            self._close_open_tag()
+            self._out.write(f"<!--{data}-->")
+
+    def _processing_instruction(self, target: str, data: str) -> None:
+        if self._skip_depth is None:
+            self._close_open_tag()
+            self._out.write(f"<?{target} {data}?>")
+
+    def _write_table(self) -> None:
+        self._close_open_tag()
+        self._written = True
+
+        table, row = self._name("table", "table"), self._name("table", "table-row")
+        self._out.write(f"<{table} {self._name('table', 'name')}={quoteattr(self._sheet_name)}>")
+        for values in self._rows:
+            self._out.write(f"<{row}>")
+            for value in values:
+                self._write_cell(value)
+            self._out.write(f"</{row}>")
+        self._out.write(f"</{table}>")
+
+    def _write_cell(self, value: object) -> None:
+        cell = self._name("table", "table-cell")
+        value_type = self._name("office", "value-type")
+        paragraph = self._name("text", "p")
+
+        if value is None:
+            self._out.write(f"<{cell}/>")
+            return
+
+        if isinstance(value, bool):
+            attrs = f'{value_type}="boolean" {self._name("office", "boolean-value")}="{str(value).lower()}"'
+            text = str(value).upper()
+        elif isinstance(value, (int, float)):
+            attrs = f'{value_type}="float" {self._name("office", "value")}="{value}"'
+            text = str(value)
+        else:
+            attrs = f'{value_type}="string"'
+            text = str(value)
+
+        self._out.write(f"<{cell} {attrs}><{paragraph}>{escape(text)}</{paragraph}></{cell}>")
+
+
+def _attr(attrs: list[str], name: str) -> Optional[str]:
+    for i in range(0, len(attrs), 2):
+        if attrs[i] == name:
+            return attrs[i + 1]
+
+    return None
+
+
+def write_sheet(
+    src_path: str | Path,
+    dst_path: str | Path,
+    sheet_name: str,
+    rows: Iterable[Sequence[object]],
+) -> None:
+    """
+    Copy an ODS document, adding a sheet to it.
+
+    content.xml of the copy is streamed: neither the original document nor
+    the new one is held in memory, and `rows` are consumed one by one while
+    writing. Existing sheet named `sheet_name` is replaced, otherwise new
+    sheet is added after the last one. Other archive entries are copied
+    as is.
+
+    Args:
+        src_path:
+            Path to an .ods file.
+        dst_path:
+            Path to the resulting .ods file, may be the same as `src_path`.
+        sheet_name:
+            Name of the new sheet.
+        rows:
+            Rows of the new sheet. Values may be `None` (empty cell),
+            strings, numbers or booleans.
+
+    Raises:
+        OSError:
+            Unable to read or write the file.
+
+        ValueError:
+            The file is not a valid ODS document.
+    """
+    src_path = Path(src_path).expanduser()
+    dst_path = Path(dst_path).expanduser()
+
+    # Write to a temporary file next to the destination: source and
+    # destination may be the same file, and nobody should see partially
+    # written documents.
+    fd, tmp_name = tempfile.mkstemp(dir=dst_path.parent, suffix=".ods")
+    os.close(fd)
+    try:
+        try:
+            with ZipFile(src_path) as src, ZipFile(tmp_name, "w") as dst:
+                if "content.xml" not in src.namelist():
+                    raise ValueError("ODS archive does not contain content.xml")
+
+                for info in src.infolist():
+                    # "mimetype" has to stay first and uncompressed, so
+                    # compression and order of entries are preserved.
+                    dst_info = ZipInfo(info.filename, date_time=info.date_time)
+                    dst_info.compress_type = info.compress_type
+                    dst_info.external_attr = info.external_attr
+
+                    with src.open(info) as src_file:
+                        if info.filename != "content.xml":
+                            with dst.open(dst_info, "w") as dst_file:
+                                shutil.copyfileobj(src_file, dst_file)
+                            continue
+
+                        dst_info.compress_type = ZIP_DEFLATED
+                        with (
+                            dst.open(dst_info, "w") as dst_file,
+                            io.TextIOWrapper(dst_file, encoding="utf-8") as out,
+                        ):
+                            _ContentRewriter(out, sheet_name, rows).rewrite(src_file)
+        except BadZipFile as exc:
+            raise ValueError(f"{src_path!s} is not a valid ODS file") from exc
+
+        os.replace(tmp_name, dst_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
 
 
 def main():
@@ -1,14 +1,19 @@
 import dataclasses
+import numbers
 import operator
-from collections.abc import Container
-from functools import reduce
-from typing import Optional, Iterable, TypedDict, Literal, NotRequired, Generator, Sequence
+from collections.abc import Container, Mapping
+from functools import reduce, lru_cache
+from typing import Optional, Iterable, TypedDict, Literal, NotRequired, Generator, Sequence, TextIO, NamedTuple,\
+    TYPE_CHECKING
 
 from characteristic import Characteristic
 from nature import Nature
-from pkmn_stat import StatType, Stat, StatsData, InputStatsData_T, LVL_RANGE
-from pokemon import Species_T, Sample, NatureIVSets_T, Pokemon
-from utils import colored
+from pkmn_stat import StatType, Stat, StatData, StatsData, InputStatsData_T, NatureMult_T, BaseStats, LVL_RANGE
+from pokemon import Species, Species_T, Sample, IVSets_T, Pokemon
+from utils import colored, IVMask
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class ObsStat(TypedDict):
@@ -24,17 +29,227 @@ class Suggestion:
     # How much EV should we add so that IV set will be narrowed on the very
     # next level.
     delta_ev: Optional[int] = None
+    # How much EV should we add so that IV will be known exactly on the very
+    # next level: stats differ for every IV in the set. 0 if they differ
+    # already.
+    exact_delta_ev: Optional[int] = None
 
 
 @dataclasses.dataclass
 class CalcedIVSet:
-    values: set[int] = dataclasses.field(default_factory=lambda: set(Stat.IV_RANGE))
+    values: IVMask = dataclasses.field(
+        default_factory=lambda: IVMask.from_range(Stat.IV_RANGE.min, Stat.IV_RANGE.max)
+    )
     suggestion: Suggestion = dataclasses.field(default_factory=Suggestion)
 
 
 type CalcedIVSets_T = dict[StatType, CalcedIVSet]
 
 
+class _StatParams(NamedTuple):
+    """Everything suggestions need to know about a `Stat`."""
+    type: StatType
+    base: int
+    lvl: int
+    ev: int
+    mult: Optional[NatureMult_T]
+
+
+# Keys of `StatData` which `IVTracker` handles without `Sample`.
+_PLAIN_STAT_DATA_KEYS = frozenset(("value", "ev"))
+
+
+class IVTracker:
+    """
+    IV sets of one Pokémon, updated observation by observation.
+
+    IV sets are tracked separately for every nature which is still possible:
+    a nature is ruled out as soon as any of its IV sets becomes empty, and
+    `iv_sets` are the union over the remaining natures. Once the remaining
+    natures share multipliers, observations are inverted for one of them
+    only.
+
+    Every observation costs the same regardless of how many were made before,
+    so the tracker can follow a Pokémon during play or through long
+    observation histories.
+    """
+    def __init__(
+        self,
+        spec: Optional[Species_T] = None,
+        nature: Optional[Nature] = None,
+        characteristic: Optional[Characteristic] = None,
+    ):
+        """`spec` is used for observations without `spec` key."""
+        self._spec = spec
+        self._nature = nature
+        self._characteristic = characteristic
+        # Observations are validated by `Sample` unless they are plain, see
+        # `_get_fast_data`. Only observations themselves are checked there.
+        self._valid_meta = (
+            isinstance(nature, Optional[Nature])
+            and isinstance(characteristic, Optional[Characteristic])
+        )
+        self._iv_sets: CalcedIVSets_T = {
+            stat_type: CalcedIVSet()
+            for stat_type in StatType
+        }
+        # IV sets of every possible nature, `None` before the first
+        # observation. If characteristic is not defined, all simple natures
+        # are represented by `Nature.DEFAULT`, see `Sample.get_iv_sets`.
+        self._nature_iv_sets: Optional[IVSets_T] = None
+        self._observed = 0
+
+    @property
+    def iv_sets(self) -> CalcedIVSets_T:
+        """Current IV sets with suggestions, updated in place."""
+        return self._iv_sets
+
+    @property
+    def natures(self) -> Optional[tuple[Nature, ...]]:
+        """Natures which are still possible, `None` before the first observation."""
+        if self._nature_iv_sets is None:
+            return None
+        return tuple(self._nature_iv_sets)
+
+    @property
+    def observed(self) -> int:
+        """Number of observations made so far."""
+        return self._observed
+
+    def observe(self, obs_stat: ObsStat) -> CalcedIVSets_T:
+        """
+        Narrow IV sets down using observed stats values, and update
+        suggestions.
+
+        Raises:
+            ValueError:
+                Observation is invalid.
+
+            RuntimeError:
+                Observation contradicts previous ones. IV sets are left as
+                they were.
+        """
+        calc_nature = self._get_calc_nature()
+        fast_data = self._get_fast_data(obs_stat, calc_nature)
+        sample_iv_sets = None if fast_data is None else Sample.calc_iv_sets(*fast_data)
+        sample = None
+        if sample_iv_sets is not None:
+            if calc_nature is not None and self._nature is None:
+                # Remaining natures are equivalent to `calc_nature`.
+                sample_iv_sets = dict.fromkeys(self._nature_iv_sets, sample_iv_sets[calc_nature])
+        else:
+            # Invalid or unusual observation: `Sample` validates it and
+            # raises a proper error.
+            sample = Sample(
+                spec=obs_stat.get("spec", self._spec),  # validated in `Sample`
+                lvl=obs_stat["lvl"],
+                nature=self._nature,
+                characteristic=self._characteristic,
+                stats=obs_stat["stats"],
+            )
+            sample_iv_sets = sample.get_iv_sets()
+
+        # Intersect with current state of sets, nature by nature.
+        self._nature_iv_sets = _update_nature_iv_sets(
+            self._observed + 1, obs_stat, self._nature_iv_sets, sample_iv_sets
+        )
+        self._observed += 1
+
+        # Generally, several natures are possible, and we have to merge
+        # their iv sets.
+        for stat_type, calced_iv_set in self._iv_sets.items():
+            calced_iv_set.values = reduce(
+                operator.or_,
+                (nature_iv_sets[stat_type] for nature_iv_sets in self._nature_iv_sets.values())
+            )
+
+        mults = self._get_known_mults()
+        stats: dict[StatType, Stat | _StatParams] = {}
+        if sample is None:
+            base_stats, lvl, stats_data, _, _ = fast_data
+            for stat_type, (_, ev) in stats_data.items():
+                stats[stat_type] = _StatParams(stat_type, base_stats[stat_type], lvl, ev, mults[stat_type])
+        else:
+            lvl = sample.lvl
+            for stat_type in StatType:
+                stat = sample.get_stat_copy(stat_type)
+                # Unknown EVs are handled by `Stat` itself.
+                if isinstance(stat.ev, int):
+                    stat = _StatParams(stat_type, stat.base, stat.lvl, stat.ev, mults[stat_type])
+                stats[stat_type] = stat
+
+        _update_suggestions(lvl, stats, self._iv_sets)
+
+        return self._iv_sets
+
+    def _get_known_mults(self) -> dict[StatType, Optional[NatureMult_T]]:
+        """Multipliers which all remaining natures agree on, `None` for the rest."""
+        known_mults = {}
+        for stat_type in StatType:
+            mults = {Stat.get_mult(stat_type, nature) for nature in self._nature_iv_sets}
+            known_mults[stat_type] = mults.pop() if len(mults) == 1 else None
+
+        return known_mults
+
+    def _get_calc_nature(self) -> Optional[Nature]:
+        """
+        Nature to invert observations with: the defined one, or any of
+        the remaining natures if they all share multipliers. `None` if
+        natures have to be checked one by one.
+        """
+        if self._nature is not None or self._nature_iv_sets is None:
+            return self._nature
+
+        natures = iter(self._nature_iv_sets)
+        calc_nature = next(natures)
+        for nature in natures:
+            if any(Stat.get_mult(stat_type, nature) != Stat.get_mult(stat_type, calc_nature) for stat_type in StatType):
+                return None
+
+        return calc_nature
+
+    def _get_fast_data(
+        self,
+        obs_stat: ObsStat,
+        nature: Optional[Nature],
+    ) -> Optional[tuple[BaseStats, int, dict[StatType, tuple[int, int]], Optional[Nature], Optional[Characteristic]]]:
+        """
+        Arguments of `Sample.calc_iv_sets` for a valid observation with
+        plain values and EVs of all stats, `None` for anything else.
+        """
+        if not self._valid_meta:
+            return None
+
+        spec = obs_stat.get("spec", self._spec)
+        if isinstance(spec, Pokemon):
+            spec = spec.value
+        if not isinstance(spec, Species):
+            return None
+
+        lvl = obs_stat["lvl"]
+        if type(lvl) is not int or not LVL_RANGE.min <= lvl <= LVL_RANGE.max:
+            return None
+
+        stats = obs_stat["stats"]
+        if type(stats) is not dict or len(stats) != len(StatType):
+            return None
+
+        stats_data = {}
+        for stat_type in StatType:
+            stat_data = stats.get(stat_type)
+            if type(stat_data) is not dict or not stat_data.keys() <= _PLAIN_STAT_DATA_KEYS:
+                return None
+
+            value, ev = stat_data.get("value"), stat_data.get("ev")
+            if type(value) is not int or type(ev) is not int or not Stat.EV_RANGE.min <= ev <= Stat.EV_RANGE.max:
+                return None
+
+            stats_data[stat_type] = value, ev
+
+        # noinspection PyProtectedMember
+        return spec._base_stats, lvl, stats_data, nature, self._characteristic
+
+
 def get_iv_sets(
     obs_stats: Iterable[ObsStat],
     spec: Optional[Species_T] = None,
@@ -43,96 +258,239 @@ def get_iv_sets(
     label: Optional[str] = None  # not used, just for `ObsSample` matching
 ) -> CalcedIVSets_T:
     """
-    Calculate IV sets using observed stats values.
+    Calculate IV sets using observed stats values, see `IVTracker`.
     If `ObsStat` is missing `spec` key - `spec` argument will be used.
     """
-    iv_sets: CalcedIVSets_T = {
-        stat_type: CalcedIVSet()
+    tracker = IVTracker(spec, nature, characteristic)
+    for obs_stats_sample in obs_stats:
+        tracker.observe(obs_stats_sample)
+
+    return tracker.iv_sets
+
+
+def get_obs_iv_masks(
+    obs_stats: Iterable[ObsStat],
+    spec: Optional[Species_T] = None,
+    nature: Optional[Nature] = None,
+) -> "np.ndarray":
+    """
+    IVs of every stat of every observation on its own, with NumPy, see
+    `Stat.get_iv_masks_batch`: one row per observation, one column per
+    `StatType`, `uint32` masks (bits of `IVMask`), 0 for impossible values.
+
+    The same as `Stat.get_iv` of stats of a `Sample` with `nature`, but for
+    whole sheets or logs at once. Observations are not validated. Nature
+    elimination, characteristic and intersection across observations are
+    left to the caller, see `IVTracker`.
+    If `ObsStat` is missing `spec` key - `spec` argument will be used.
+
+    Raises:
+        TypeError:
+            Stat value or EV is not an integer (EV can be `None`: unknown),
+            or IV is given.
+    """
+    import numpy as np
+
+    mult_codes = [
+        Stat.get_mult_code(stat_type, None if nature is None else Stat.get_mult(stat_type, nature))
         for stat_type in StatType
-    }
-    # TODO: TEMP, REMOVE. For debug.
-    _all_iv_sets = []
-
-    for i, obs_stats_sample in enumerate(obs_stats, start=1):
-        sample = Sample(
-            spec=obs_stats_sample.get("spec", spec),  # validated in `Sample`
-            lvl=obs_stats_sample["lvl"],
-            nature=nature,
-            characteristic=characteristic,
-            stats=obs_stats_sample["stats"],
-        )
-        # Generally, result will have iv sets for each possible nature, and
-        # we have to merge them
-        sample_iv_sets = sample.get_iv_sets()
-        sample_merged_iv_sets = {
-            stat_type: reduce(
-                operator.or_,
-                (nature_iv_sets[stat_type] for nature_iv_sets in sample_iv_sets.values())
-            )
-            for stat_type in StatType
-        }
-        # TODO: TEMP, REMOVE. For debug.
-        _all_iv_sets.append({
-            "lvl": obs_stats_sample["lvl"],
-            "iv": (min(sample_merged_iv_sets[StatType.ATK]), max(sample_merged_iv_sets[StatType.ATK])),
-            "ev": obs_stats_sample["stats"][StatType.ATK]["ev"],
-            "val": obs_stats_sample["stats"][StatType.ATK]["value"]
-        })
+    ]
+    rows = []
+    for obs_stat in obs_stats:
+        obs_spec = obs_stat.get("spec", spec)
+        if isinstance(obs_spec, Pokemon):
+            obs_spec = obs_spec.value
+        # noinspection PyProtectedMember
+        base_stats = obs_spec._base_stats
+        lvl = obs_stat["lvl"]
+        for stat_type, mult_code in zip(StatType, mult_codes):
+            value, ev = _get_plain_stat_data(stat_type, obs_stat["stats"][stat_type])
+            # Negative EV is unknown.
+            rows.append((base_stats[stat_type], lvl, value, -1 if ev is None else ev, mult_code))
+
+    columns = np.array(rows, dtype=np.int64).reshape(-1, 5).T
+    return Stat.get_iv_masks_batch(*columns).reshape(-1, len(StatType))
+
+
+def _get_plain_stat_data(stat_type: StatType, stat_data: object) -> tuple[int, Optional[int]]:
+    """(value, EV) of `get_obs_iv_masks` input, see `InputStatsData_T`."""
+    if isinstance(stat_data, StatData):
+        value, iv, ev = stat_data.value, stat_data.iv, stat_data.ev
+    elif isinstance(stat_data, dict):
+        value, iv, ev = stat_data.get("value"), stat_data.get("iv"), stat_data.get("ev")
+    else:
+        value, iv, ev = stat_data, None, None
+
+    if iv is not None:
+        raise TypeError(f"{stat_type.name} IV can't be given for batch calculation, use `Sample`")
+    if not _is_int(value):
+        raise TypeError(f"{stat_type.name} value should be an integer for batch calculation, got {value!r}")
+    if ev is not None and not _is_int(ev):
+        raise TypeError(f"{stat_type.name} EV should be an integer or None for batch calculation, got {ev!r}")
 
-        # And finally - intersect with current state of sets:
-        _update_iv_sets(i, obs_stats_sample, iv_sets, sample_merged_iv_sets)
+    return value, ev
 
-        _update_suggestions(sample, iv_sets)
 
-    return iv_sets
+def _is_int(value: object) -> bool:
+    return isinstance(value, numbers.Integral) and not isinstance(value, bool)
 
 
-def _update_iv_sets(
+def _update_nature_iv_sets(
     i: int,
     obs_stats_sample: ObsStat,
-    iv_sets: CalcedIVSets_T,
-    sample_merged_iv_sets: NatureIVSets_T
-) -> None:
-    """Update `iv_sets` given new data: `sample_merged_iv_sets`."""
+    nature_iv_sets: Optional[IVSets_T],
+    sample_iv_sets: IVSets_T
+) -> IVSets_T:
+    """
+    Intersect IV sets of every nature in `nature_iv_sets` (all natures if
+    it's `None`) with new data: `sample_iv_sets`. Natures with an empty
+    IV set are dropped.
+
+    Returns:
+        IV sets of remaining natures.
+
+    Raises:
+        RuntimeError:
+            No nature remains.
+    """
+    updated = {}
+    for nature, iv_sets in sample_iv_sets.items():
+        if nature_iv_sets is not None:
+            if nature not in nature_iv_sets:
+                continue
+            iv_sets = {
+                stat_type: nature_iv_sets[nature][stat_type] & iv_sets[stat_type]
+                for stat_type in StatType
+            }
+        updated[nature] = iv_sets
+
+    remaining = {
+        nature: iv_sets
+        for nature, iv_sets in updated.items()
+        if all(iv_sets.values())
+    }
+    if remaining:
+        return remaining
+
     for stat_type in StatType:
-        stored_values = iv_sets[stat_type].values
-        stored_values &= sample_merged_iv_sets[stat_type]
-        if not stored_values:
+        if not any(iv_sets[stat_type] for iv_sets in updated.values()):
             raise RuntimeError(
                 f"{stat_type.name} stats in first {i} blocks are impossible."
                 f" Consider double checking stats on LVL {obs_stats_sample['lvl']}"
             )
 
+    raise RuntimeError(
+        f"Stats in first {i} blocks are impossible with any nature."
+        f" Consider double checking stats on LVL {obs_stats_sample['lvl']}"
+    )
+
 
 def _update_suggestions(
-    sample: Sample,
+    lvl: int,
+    stats: Mapping[StatType, Stat | _StatParams],
     iv_sets: CalcedIVSets_T
 ) -> None:
     """For each `StatType` in `iv_sets` update `suggestion`:
     1. Next level on which IV set will be narrowed.
     2. How much EV should we add so that IV set will be narrowed on the very
        next level.
+    3. How much EV should we add so that IV will be known exactly on the
+       very next level.
     """
     for stat_type, calced_iv_set in iv_sets.items():
-        stat = sample.get_stat_copy(stat_type)
+        stat = stats[stat_type]
 
         calced_iv_set.suggestion.update_lvl = _get_update_lvl(stat, calced_iv_set.values)
 
-        # noinspection PyUnresolvedReferences
-        if calced_iv_set.suggestion.update_lvl != sample.lvl + 1:
+        if calced_iv_set.suggestion.update_lvl != lvl + 1:
             calced_iv_set.suggestion.delta_ev = _get_delta_ev(stat, calced_iv_set.values)
         else:
             calced_iv_set.suggestion.delta_ev = 0
 
+        calced_iv_set.suggestion.exact_delta_ev = _get_exact_delta_ev(stat, calced_iv_set.values)
+
+
+# Stat values are packed into integers, `_VAL_BITS` bits per value, see
+# `_get_lvl_vals` and `_get_part_vals`. The highest bit is never used by
+# values, see `_HIGH_BITS`.
+_VAL_BITS = 16
+# Max IV-dependent part of a stat: `2*base + iv + ev//4`.
+_MAX_PART = 2*Stat.BASE_RANGE.max + Stat.IV_RANGE.max + Stat.EV_RANGE.max//4
+# EVs matter only through `ev//4`.
+_EV_QUARTERS = range(Stat.EV_RANGE.max//4 + 1)
+_EV_QUARTERS_MASK = (1 << len(_EV_QUARTERS)*_VAL_BITS) - 1
+# Adding `_LOW_BITS` to packed differences of values sets the highest bit of
+# every non-zero value: bitmask of `_HIGH_BITS` tells which values differ.
+_LOW_BITS = sum(((1 << _VAL_BITS - 1) - 1) << i*_VAL_BITS for i in _EV_QUARTERS)
+_HIGH_BITS = sum(1 << (i + 1)*_VAL_BITS - 1 for i in _EV_QUARTERS)
+
+
+@lru_cache(maxsize=None)
+def _get_lvl_vals(stat_type: StatType, part: int, mult: Optional[NatureMult_T]) -> int:
+    """
+    Stat values on all levels, given IV-dependent part of the stat:
+    `2*base + iv + ev//4`. That's all the stat formula needs, so the part
+    is passed to `Stat.calc_val` as IV of a zero base stat without EVs.
+
+    Values are packed into one integer, value on `lvl` is the `lvl`-th one,
+    so levels on which two stats differ are found with a single XOR.
+    """
+    vals = 0
+    for lvl in LVL_RANGE:
+        vals |= Stat.calc_val(stat_type, 0, lvl, part, 0, mult) << lvl*_VAL_BITS
+
+    return vals
+
 
-def _get_update_lvl(stat: Stat, iv_set: set[int]) -> Optional[int]:
+@lru_cache(maxsize=None)
+def _get_part_vals(stat_type: StatType, lvl: int, mult: Optional[NatureMult_T]) -> int:
+    """
+    Stat values on `lvl` for all IV-dependent parts of the stat (see
+    `_get_lvl_vals`) packed into one integer, value of `part` is the
+    `part`-th one. Shifted by `2*base + iv`, it gives values for all `ev//4`.
+    """
+    vals = 0
+    for part in range(_MAX_PART + 1):
+        vals |= Stat.calc_val(stat_type, 0, lvl, part, 0, mult) << part*_VAL_BITS
+
+    return vals
+
+
+def _get_mults(stat: Stat | _StatParams) -> tuple[Optional[NatureMult_T], ...]:
+    """
+    Multipliers to check: stats differ if they differ with any of them.
+    Unknown multiplier of a non-HP stat is one of non-default multipliers,
+    see `Stat.MULT_RANGE`.
+    """
+    if stat.type != StatType.HP and stat.mult is None:
+        return Stat.DECREASED_MULT, Stat.INCREASED_MULT
+    return (stat.mult,)
+
+
+def _get_update_lvl(stat: Stat | _StatParams, iv_set: IVMask) -> Optional[int]:
     if len(iv_set) < 2:
         # No suggestion possible.
         return None
 
-    min_iv, max_iv = min(iv_set), max(iv_set)
+    min_iv, max_iv = iv_set.min, iv_set.max
     # noinspection PyTypeChecker
     cur_lvl: int = stat.lvl
+    ev = stat.ev
+    if isinstance(ev, int):
+        fixed_part = 2*stat.base + ev//4
+        diff = 0
+        for mult in _get_mults(stat):
+            diff |= (
+                _get_lvl_vals(stat.type, fixed_part + min_iv, mult)
+                ^ _get_lvl_vals(stat.type, fixed_part + max_iv, mult)
+            )
+        diff >>= (cur_lvl + 1) * _VAL_BITS
+        if not diff:
+            # No suggestion found :(
+            return None
+        return cur_lvl + 1 + ((diff & -diff).bit_length() - 1) // _VAL_BITS
+
+    # EVs are not known exactly.
     for lvl in range(cur_lvl + 1, LVL_RANGE.max + 1):
         if stat.get_val(lvl=lvl, iv=min_iv) != stat.get_val(lvl=lvl, iv=max_iv):
             return lvl
@@ -141,35 +499,79 @@ def _get_update_lvl(stat: Stat, iv_set: set[int]) -> Optional[int]:
     return None
 
 
-def _get_delta_ev(stat: Stat, iv_set: set[int]) -> Optional[int]:
-    if len(iv_set) < 2:
-        # No suggestion possible.
-        return None
-
-    min_iv, max_iv = min(iv_set), max(iv_set)
+def _get_delta_ev_for_pairs(
+    stat: Stat | _StatParams,
+    iv_pairs: Iterable[tuple[int, int]],
+    min_delta_ev: int = 1,
+) -> Optional[int]:
+    """
+    How much EV (at least `min_delta_ev`) should we add so that stats differ
+    on the very next level for every pair of IVs in `iv_pairs`.
+    """
     # noinspection PyUnresolvedReferences
     lvl: int = stat.lvl + 1
     # noinspection PyTypeChecker
     cur_ev: int = stat.ev
-    # Yes, it makes sense to check only multiples of 4 here, but let's not
-    # handle stat calculation here and leave it encapsulated in `Stat`.
-    for ev in range(cur_ev + 1, Stat.EV_RANGE.max + 1):
-        if stat.get_val(lvl=lvl, iv=min_iv, ev=ev) != stat.get_val(lvl=lvl, iv=max_iv, ev=ev):
-            return ev - cur_ev
+    first_ev = cur_ev + min_delta_ev
+    if first_ev > Stat.EV_RANGE.max:
+        # No suggestion found :(
+        return None
 
-    # No suggestion found :(
-    return None
+    # Bitmask of `ev//4` values on which all pairs differ so far.
+    separating = _HIGH_BITS
+    for low_iv, high_iv in iv_pairs:
+        differing = 0
+        for mult in _get_mults(stat):
+            vals = _get_part_vals(stat.type, lvl, mult)
+            diff = (vals >> (2*stat.base + low_iv)*_VAL_BITS) ^ (vals >> (2*stat.base + high_iv)*_VAL_BITS)
+            differing |= ((diff & _EV_QUARTERS_MASK) + _LOW_BITS) & _HIGH_BITS
+        separating &= differing
+
+    first_ev_quarter = first_ev // 4
+    separating >>= first_ev_quarter * _VAL_BITS
+    if not separating:
+        # No suggestion found :(
+        return None
+
+    ev_quarter = first_ev_quarter + ((separating & -separating).bit_length() - 1) // _VAL_BITS
+    # The lowest EV with this `ev//4`, but not lower than the first one.
+    return max(first_ev, 4*ev_quarter) - cur_ev
+
+
+def _get_delta_ev(stat: Stat | _StatParams, iv_set: IVMask) -> Optional[int]:
+    if len(iv_set) < 2:
+        # No suggestion possible.
+        return None
+
+    if not isinstance(stat.ev, int):
+        raise TypeError(f"{stat.type} EV is unknown")
+
+    return _get_delta_ev_for_pairs(stat, [(iv_set.min, iv_set.max)])
+
+
+def _get_exact_delta_ev(stat: Stat | _StatParams, iv_set: IVMask) -> Optional[int]:
+    if len(iv_set) < 2:
+        # No suggestion possible.
+        return None
+
+    if not isinstance(stat.ev, int):
+        raise TypeError(f"{stat.type} EV is unknown")
+
+    # Stats grow with IVs, so adjacent IVs are the hardest to tell apart.
+    # Like `delta_ev`, it's 0 if the current EV is enough already.
+    ivs = list(iv_set)
+    return _get_delta_ev_for_pairs(stat, zip(ivs, ivs[1:]), min_delta_ev=0)
 
 
-def _mid_iv_ranker(iv_set: set[int]) -> float:
+def _mid_iv_ranker(iv_set: IVMask) -> float:
     return sum(iv_set) / len(iv_set)
 
 
-def _iv_set_str_it(iv_set: set[int]) -> Generator[str, None, None]:
+def _iv_set_str_it(iv_set: IVMask) -> Generator[str, None, None]:
     if not iv_set:
         return
 
-    it = iter(sorted(iv_set))
+    it = iter(iv_set)
     left = right = next(it)
     for v in it:
         if v == right + 1:
@@ -180,7 +582,7 @@ def _iv_set_str_it(iv_set: set[int]) -> Generator[str, None, None]:
     yield f"{left}-{right}" if left < right else str(left)
 
 
-def _get_iv_set_str(iv_set: set[int]) -> str:
+def get_iv_set_str(iv_set: IVMask) -> str:
     return f"[{', '.join(_iv_set_str_it(iv_set))}]"
 
 
@@ -192,13 +594,15 @@ def pprint_iv_sets(
     color_mode: ColorMode = "max",
     important_stat_types: Optional[Sequence[StatType]] = None,
     print_only_important: bool = False,
+    file: Optional[TextIO] = None,
 ) -> None:
+    """`file` is the standard output by default."""
     if color_mode == "min":
-        ranker = min
+        ranker = operator.attrgetter("min")
     elif color_mode == "mid":
         ranker = _mid_iv_ranker
     elif color_mode == "max":
-        ranker = max
+        ranker = operator.attrgetter("max")
     else:
         raise RuntimeError(f"Unsupported {color_mode=!r}")
 
@@ -208,7 +612,7 @@ def pprint_iv_sets(
 
     max_stat_type_len = max(len(stat_type.name) for stat_type in important_stat_types)
     str_iv_sets = {
-        stat_type: _get_iv_set_str(iv_sets[stat_type].values)
+        stat_type: get_iv_set_str(iv_sets[stat_type].values)
         for stat_type in important_stat_types
     }
     max_iv_set_len = max(len(iv_set_str) for iv_set_str in str_iv_sets.values())
@@ -225,7 +629,7 @@ def pprint_iv_sets(
         color, on_color = None, None
         if stat_type not in important_stat_types:
             color = "dark_grey"
-        elif len(iv_set) == 1 and next(iter(iv_set)) == Stat.IV_RANGE.max:
+        elif len(iv_set) == 1 and iv_set.max == Stat.IV_RANGE.max:
             on_color = "on_green"        # exactly highest
         elif (rank := ranker(iv_set)) == Stat.IV_RANGE.max:
             # It can appear only for `color_mode='max'`.
@@ -246,7 +650,7 @@ def pprint_iv_sets(
             f" update_lvl={str(update_lvl):4}, {delta_ev=}",
             color=color,
             on_color=on_color
-        ))
+        ), file=file)
 
 
 def main():
@@ -0,0 +1,320 @@
+import csv
+import itertools
+import json
+from enum import Enum
+from pathlib import Path
+from typing import Optional, Iterable, Literal, NoReturn, Generator
+
+import voluptuous as vlps
+
+from characteristic import Characteristic
+import iv_calc
+from iv_calc import CalcedIVSets_T
+from iv_calc_ods import ObsSample
+from nature import Nature
+from pkmn_stat import StatType
+from pokemon import Pokemon
+
+type Format_T = Literal["jsonl", "csv"]
+
+_FORMATS_BY_SUFFIX: dict[str, Format_T] = {
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".csv": "csv",
+}
+# Suffix of EV fields, e.g. "HP_EV".
+EV_SUFFIX = "_EV"
+# (stat type, TOTAL field, EV field)
+_STAT_FIELDS = tuple(
+    (stat_type, stat_type.name, f"{stat_type.name}{EV_SUFFIX}")
+    for stat_type in StatType
+)
+
+# Raw record: line number and fields by name.
+_Record_T = tuple[int, dict[str, object]]
+
+
+class LogFormatError(ValueError):
+    pass
+
+
+def _fail(path: Path, line_no: int, message: str) -> NoReturn:
+    raise LogFormatError(f"{path!s}:{line_no}: {message}")
+
+
+def iter_samples(
+    path: str | Path,
+    fmt: Optional[Format_T] = None,
+) -> Generator[ObsSample]:
+    """
+    Read observation samples from a level-up log, line by line.
+
+    Only the current sample is kept in memory, so logs of any size can be
+    processed.
+
+    The log is either JSONL (one JSON object per line) or CSV with a header.
+    `fmt` is taken from the file extension (.jsonl, .ndjson or .csv) by
+    default. Both formats have the same fields; every line (record)
+    describes one observation:
+
+    * label:            sample label, optional;
+    * pokemon:          Pokémon name (`Pokemon` enum);
+    * nature:           Nature (`Nature` enum), optional;
+    * characteristic:   Characteristic (`Characteristic` enum), optional;
+    * lvl:              level, integer;
+    * HP, ATK, ...:     TOTAL values of all `StatType`s, integers;
+    * HP_EV, ATK_EV...: EV values, integers; missing or empty EV means 0.
+
+    Empty values (empty string in CSV, null in JSON) are treated as missing.
+    Enum names are case-insensitive.
+
+    Consecutive lines with the same label form one sample, in the order of
+    observation. Consecutive lines without a label form one sample too, so
+    samples which follow each other should be labeled. `pokemon` is required
+    on the first line of a sample: lines without it inherit the previous one,
+    and a different Pokémon means an evolution, just like "evolution columns"
+    in `iv_calc_ods._parse_ods`. `nature` and `characteristic` can be given
+    on any lines of a sample, but they should be the same.
+
+    Example (CSV)
+    =============
+
+    label,pokemon,nature,characteristic,lvl,HP,ATK,DEF,SPATK,SPDEF,SPEED,ATK_EV,SPEED_EV
+    MK1,MAGIKARP,ADAMANT,,10,26,9,16,8,10,23,,
+    MK1,,,,12,29,11,19,9,11,27,4,2
+    MK2,MAGIKARP,JOLLY,LIKES_TO_RUN,10,25,7,18,7,10,26,,
+
+    Raises:
+        ValueError:
+            Unknown `fmt`, or it's `None` and the file extension is unknown.
+            Raised right away, other errors are raised during iteration.
+
+        OSError:
+            The file cannot be opened.
+
+        LogFormatError:
+            Log is invalid.
+    """
+    path = Path(path).expanduser()
+    if fmt is None:
+        try:
+            fmt = _FORMATS_BY_SUFFIX[path.suffix.lower()]
+        except KeyError:
+            raise ValueError(f"Unknown log format of {path!s}, specify `fmt` explicitly")
+    elif fmt not in _FORMATS_BY_SUFFIX.values():
+        raise ValueError(f"Unknown log format {fmt!r}")
+
+    return _iter_samples(path, fmt)
+
+
+def _iter_samples(path: Path, fmt: Format_T) -> Generator[ObsSample]:
+    sample: Optional[ObsSample] = None
+    for line_no, record in _iter_records(path, fmt):
+        label = _parse_label(record)
+        nature = _parse_enum(path, line_no, record, "nature", Nature)
+        characteristic = _parse_enum(path, line_no, record, "characteristic", Characteristic)
+
+        if sample is None or label != sample["label"]:
+            if sample is not None:
+                yield sample
+
+            spec = _parse_enum(path, line_no, record, "pokemon", Pokemon)
+            if spec is None:
+                _fail(path, line_no, "pokemon is required on the first line of a sample")
+
+            sample = {
+                "label": label,
+                "spec": spec,
+                "nature": nature,
+                "characteristic": characteristic,
+                "obs_stats": [],
+            }
+        else:
+            sample["spec"] = _parse_enum(path, line_no, record, "pokemon", Pokemon) or sample["spec"]
+            sample["nature"] = _merge_meta(path, line_no, "nature", sample["nature"], nature)
+            sample["characteristic"] = _merge_meta(
+                path, line_no, "characteristic", sample["characteristic"], characteristic
+            )
+
+        sample["obs_stats"].append({
+            "lvl": _parse_int(path, line_no, record, "lvl"),
+            "stats": {
+                stat_type: {
+                    "value": _parse_int(path, line_no, record, total_field),
+                    "ev": _parse_int(path, line_no, record, ev_field, required=False) or 0,
+                }
+                for stat_type, total_field, ev_field in _STAT_FIELDS
+            },
+            "spec": sample["spec"],
+        })
+
+    if sample is not None:
+        yield sample
+
+
+def _iter_records(path: Path, fmt: Format_T) -> Generator[_Record_T]:
+    with path.open(newline="", encoding="utf-8") as file:
+        if fmt == "csv":
+            reader = csv.DictReader(file)
+            if reader.fieldnames is None:
+                # Empty file.
+                return
+
+            missing = [
+                field
+                for field in ("lvl", *(total_field for _, total_field, _ in _STAT_FIELDS))
+                if field not in reader.fieldnames
+            ]
+            if missing:
+                _fail(path, 1, f"missing columns: {', '.join(missing)}")
+
+            for record in reader:
+                yield reader.line_num, record
+            return
+
+        for line_no, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                _fail(path, line_no, f"invalid JSON: {e}")
+
+            if not isinstance(record, dict):
+                _fail(path, line_no, "expected a JSON object")
+
+            yield line_no, record
+
+
+def _get_field(record: dict[str, object], name: str) -> object:
+    value = record.get(name)
+    return None if value == "" else value
+
+
+def _parse_label(record: dict[str, object]) -> Optional[str]:
+    value = _get_field(record, "label")
+    # noinspection PyStringConversionWithoutDunderMethod
+    return None if value is None else str(value)
+
+
+def _parse_int(
+    path: Path,
+    line_no: int,
+    record: dict[str, object],
+    name: str,
+    required: bool = True,
+) -> Optional[int]:
+    value = _get_field(record, name)
+    if value is None:
+        if required:
+            _fail(path, line_no, f"{name} is required")
+        return None
+
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+
+    _fail(path, line_no, f"{name} should be an integer, got {value!r}")
+
+
+def _parse_enum[T: Enum](
+    path: Path,
+    line_no: int,
+    record: dict[str, object],
+    name: str,
+    enum_type: type[T],
+) -> Optional[T]:
+    value = _get_field(record, name)
+    if value is None:
+        return None
+
+    if isinstance(value, str):
+        try:
+            return enum_type[value.strip().upper()]
+        except KeyError:
+            pass
+
+    _fail(path, line_no, f"unknown {name} {value!r}")
+
+
+def _merge_meta[T: Enum](
+    path: Path,
+    line_no: int,
+    name: str,
+    current: Optional[T],
+    value: Optional[T],
+) -> Optional[T]:
+    if value is None:
+        return current
+
+    if current is not None and value != current:
+        _fail(path, line_no, f"{name} {value.name} differs from {current.name} on previous lines of the sample")
+
+    return value
+
+
+def get_samples_iv_sets(
+    path: str | Path,
+    fmt: Optional[Format_T] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    allowed_labels: Optional[set[str]] = None,
+) -> Generator[tuple[ObsSample, CalcedIVSets_T]]:
+    """
+    Read observation samples from a level-up log, see `iter_samples`, and
+    calculate their IV sets as soon as they are read.
+
+    Args:
+        path:
+            Path to a log file.
+        fmt:
+            Log format, by default taken from the file extension.
+        skip:
+            Number of first records to skip
+        limit:
+            Max number of records to return
+        allowed_labels:
+            Additional filter on top of `skip` + `limit` pair, and applied
+            after it.
+
+    Returns:
+        Observation samples with their iv sets
+
+    Raises:
+        ValueError:
+            Unknown `fmt`, see `iter_samples`. Raised right away.
+
+        OSError:
+            The file cannot be opened.
+
+        LogFormatError:
+            Log is invalid.
+    """
+    samples: Iterable[ObsSample] = itertools.islice(
+        iter_samples(path, fmt),
+        skip,
+        None if limit is None else skip + limit,
+    )
+    return _calc_samples_iv_sets(samples, allowed_labels)
+
+
+def _calc_samples_iv_sets(
+    samples: Iterable[ObsSample],
+    allowed_labels: Optional[set[str]],
+) -> Generator[tuple[ObsSample, CalcedIVSets_T]]:
+    for obs_sample in samples:
+        if allowed_labels is not None and obs_sample["label"] not in allowed_labels:
+            continue
+        try:
+            yield obs_sample, iv_calc.get_iv_sets(**obs_sample)
+        except vlps.Invalid as e:
+            # `MultipleInvalid` expects a list of errors, not a message.
+            raise vlps.Invalid(f"Problem with sample {obs_sample['label']!r}: {e}") from e
+        except Exception as e:
+            raise type(e)(f"Problem with sample {obs_sample['label']!r}: {e}")
@@ -1,18 +1,45 @@
+import bisect
+import itertools
 import operator
-from collections.abc import Container
+import time
+from collections.abc import Collection, Container
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Optional, Iterable, TypedDict, NoReturn, Generator, Callable
+from typing import Optional, Iterable, TypedDict, NoReturn, Generator, Callable, TextIO, TYPE_CHECKING
 
+import voluptuous as vlps
+
+import disk_cache
 import ezodf
-from characteristic import Characteristic
+from characteristic import Characteristic, CharacteristicData
 import iv_calc
 from iv_calc import CalcedIVSets_T
 from nature import Nature
 from pkmn_stat import StatType, Stat, InputStatsData_T
 from pokemon import Species_T, Sample, Pokemon, NatureIVSets_T
+from utils import IVMask
+
+if TYPE_CHECKING:
+    # sinks depend on this module.
+    import sinks
 
 BLOCK_HEIGHT = 8
+# Sheet for results in the copy of a workbook, see `write_ods_results`.
+RESULTS_SHEET_NAME = "Results"
+# Same for `comparator.process_compare_ods`, defined here to be skipped too.
+COMPARISON_SHEET_NAME = "Comparison"
+# Sheets written by this package, never parsed as samples when all sheets are
+# parsed, so results can be written into the workbook itself.
+OUTPUT_SHEET_NAMES = frozenset({RESULTS_SHEET_NAME, COMPARISON_SHEET_NAME})
+# Should be bumped on every change of the parsing result, so that workbooks
+# cached by previous versions are parsed again.
+PARSER_VERSION = 4
+# Same for IV sets calculation, see `_IVSetsStore`.
+CALC_VERSION = 5
+# Seconds between checks of a watched workbook, see `watch_ods_with_filter`.
+WATCH_INTERVAL = 0.5
 
 
 class ObsSample(TypedDict):
@@ -65,18 +92,15 @@ def _cell_name(row: int, col: int) -> str:
     return "".join(reversed(letters)) + str(row + 1)
 
 
-def _parse_sheet(sheet: ezodf.Sheet) -> list[ObsSample]:
+def _iter_block_rows(sheet: ezodf.Sheet) -> Generator[int]:
     """
-    Parse all data blocks from a single worksheet.
-
-    Empty sheet is valid and produces an empty list.
+    Find first rows of all data blocks in a worksheet without parsing them.
 
     Raises:
         OdsFormatError:
-            Sheet structure is invalid.
+            Non-empty row between data blocks. All blocks preceding it are
+            yielded first.
     """
-    samples: list[ObsSample] = []
-
     row = 0
     while True:
         block_row = _find_next_block(sheet, row)
@@ -85,25 +109,15 @@ def _parse_sheet(sheet: ezodf.Sheet) -> list[ObsSample]:
 
         _validate_empty_gap(sheet, row, block_row)
 
-        samples.append(_parse_block(sheet, block_row))
+        yield block_row
 
         row = block_row + BLOCK_HEIGHT
 
-    return samples
-
 
 def _cell_is_empty(cell: ezodf.Cell) -> bool:
     return cell.value in (None, "")
 
 
-def _row_is_empty(sheet: ezodf.Sheet, row: int) -> bool:
-    """Return True iff every cell in the row is empty."""
-    return all(
-        _cell_is_empty(sheet[row, col])
-        for col in range(sheet.ncols())
-    )
-
-
 def _find_next_block(
     sheet: ezodf.Sheet,
     start_row: int,
@@ -115,11 +129,7 @@ def _find_next_block(
         Row index of the next candidate block,
         or None if there are no more blocks.
     """
-    for row in range(start_row, sheet.nrows()):
-        if not _row_is_empty(sheet, row):
-            return row
-
-    return None
+    return sheet.next_used_row(start_row)
 
 
 def _validate_empty_gap(
@@ -134,11 +144,13 @@ def _validate_empty_gap(
         OdsFormatError:
             If any cell contains data.
     """
-    for row in range(start_row, end_row):
-        for col in range(sheet.ncols()):
-            value = sheet[row, col].value
-            if value not in (None, ""):
-                _fail(sheet, row, col, message="only completely empty rows are allowed between data blocks")
+    row = sheet.next_used_row(start_row)
+    if row is None or row >= end_row:
+        return
+
+    for col in range(sheet.used_ncols()):
+        if not _cell_is_empty(sheet[row, col]):
+            _fail(sheet, row, col, message="only completely empty rows are allowed between data blocks")
 
 
 def _parse_block(
@@ -192,12 +204,7 @@ def _parse_meta(
     Returns:
         (label, pokemon, nature, characteristic, header_column)
     """
-    label_cell = sheet[block_row, 0]
-    merged = label_cell.span
-    if merged != (1, BLOCK_HEIGHT):
-        _fail(sheet, block_row, col=0, message=f"expected a merged cell spanning 1×{BLOCK_HEIGHT}")
-    # noinspection PyStringConversionWithoutDunderMethod
-    label_value = None if label_cell.value is None else str(label_cell.value)
+    label_value = _parse_label(sheet, block_row)
 
     pkmn_label_row = block_row
     pkmn, nature_label_row = _parse_required_meta_node(
@@ -222,6 +229,16 @@ def _parse_meta(
     return label_value, pkmn, nature, characteristic, header_col
 
 
+def _parse_label(sheet: ezodf.Sheet, block_row: int) -> Optional[str]:
+    """Parse the label of a block, which is all that's needed to filter it."""
+    label_cell = sheet[block_row, 0]
+    merged = label_cell.span
+    if merged != (1, BLOCK_HEIGHT):
+        _fail(sheet, block_row, col=0, message=f"expected a merged cell spanning 1×{BLOCK_HEIGHT}")
+    # noinspection PyStringConversionWithoutDunderMethod
+    return None if label_cell.value is None else str(label_cell.value)
+
+
 def _parse_required_meta_node[T: Enum](
     sheet: ezodf.Sheet,
     label_row: int,
@@ -409,24 +426,25 @@ def _parse_level(
     if {left_header, right_header} != {total_label, ev_label}:
         _fail(sheet, block_row + 1, first_col, message=f'expected one {total_label!r} column and one {ev_label!r} column')
 
-    total_col = first_col if left_header == total_label else first_col + 1
-    ev_col = first_col if left_header == ev_label else first_col + 1
+    total_offset = 0 if left_header == total_label else 1
+    ev_offset = 1 - total_offset
+    total_col = first_col + total_offset
+    ev_col = first_col + ev_offset
+    # Values of the whole stats region at once.
+    stats_values = sheet.region(block_row + 2, first_col, len(stat_order), 2)
     stats: InputStatsData_T = {}
-    for row_offset, stat_type in enumerate(stat_order, start=2):
+    for row_offset, (stat_type, row_values) in enumerate(zip(stat_order, stats_values), start=2):
         row = block_row + row_offset
-        total_cell = sheet[row, total_col]
-        ev_cell = sheet[row, ev_col]
 
-        total = total_cell.value
+        total = row_values[total_offset]
         if not isinstance(total, int):
             _fail(sheet, row, total_col, message=f"expected an integer {total_label} value")
 
-        if _cell_is_empty(ev_cell):
+        ev = row_values[ev_offset]
+        if ev in (None, ""):
             ev = 0
-        else:
-            ev = ev_cell.value
-            if not isinstance(ev, int):
-                _fail(sheet, row, ev_col, message=f"expected an integer {ev_label} value")
+        elif not isinstance(ev, int):
+            _fail(sheet, row, ev_col, message=f"expected an integer {ev_label} value")
 
         stats[stat_type] = {
             "value": total,
@@ -440,7 +458,193 @@ def _parse_level(
     }
 
 
-def _parse_ods(path: str | Path, sheet_name: Optional[str] = None) -> list[ObsSample]:
+# Compact representation of `ObsSample` for the cache: only builtin types,
+# enums are stored by name.
+_CachedObsStat_T = tuple[int, str, tuple[tuple[str, int, int], ...]]
+_CachedObsSample_T = tuple[Optional[str], Optional[str], Optional[str], tuple[_CachedObsStat_T, ...]]
+
+
+def _encode_samples(samples: list[ObsSample]) -> list[_CachedObsSample_T]:
+    return [_encode_sample(sample) for sample in samples]
+
+
+def _encode_sample(sample: ObsSample) -> _CachedObsSample_T:
+    return (
+        sample["label"],
+        None if sample["nature"] is None else sample["nature"].name,
+        None if sample["characteristic"] is None else sample["characteristic"].name,
+        tuple(
+            (
+                obs_stat["lvl"],
+                obs_stat["spec"].name,
+                tuple(
+                    (stat_type.name, stat_data["value"], stat_data["ev"])
+                    for stat_type, stat_data in obs_stat["stats"].items()
+                ),
+            )
+            for obs_stat in sample["obs_stats"]
+        ),
+    )
+
+
+def _decode_samples(cached: list[_CachedObsSample_T]) -> list[ObsSample]:
+    samples: list[ObsSample] = []
+    for label, nature, characteristic, cached_obs_stats in cached:
+        obs_stats: list[iv_calc.ObsStat] = [
+            {
+                "lvl": lvl,
+                "stats": {
+                    StatType[stat_type]: {
+                        "value": value,
+                        "ev": ev,
+                    }
+                    for stat_type, value, ev in stats
+                },
+                "spec": Pokemon[spec],
+            }
+            for lvl, spec, stats in cached_obs_stats
+        ]
+        samples.append({
+            "label": label,
+            "spec": obs_stats[-1]["spec"],
+            "nature": None if nature is None else Nature[nature],
+            "characteristic": None if characteristic is None else Characteristic[characteristic],
+            "obs_stats": obs_stats,
+        })
+
+    return samples
+
+
+# Compact representation of `CalcedIVSets_T` for the cache:
+# ((stat type name, IV mask bits, update level, delta EV, exact delta EV), ...).
+_CachedIVSets_T = tuple[tuple[str, int, Optional[int], Optional[int], Optional[int]], ...]
+
+
+def _encode_iv_sets(iv_sets: CalcedIVSets_T) -> _CachedIVSets_T:
+    return tuple(
+        (
+            stat_type.name,
+            calced_iv_set.values.bits,
+            calced_iv_set.suggestion.update_lvl,
+            calced_iv_set.suggestion.delta_ev,
+            calced_iv_set.suggestion.exact_delta_ev,
+        )
+        for stat_type, calced_iv_set in iv_sets.items()
+    )
+
+
+def _decode_iv_sets(cached: _CachedIVSets_T) -> CalcedIVSets_T:
+    return {
+        StatType[stat_type]: iv_calc.CalcedIVSet(
+            values=IVMask(bits),
+            suggestion=iv_calc.Suggestion(
+                update_lvl=update_lvl,
+                delta_ev=delta_ev,
+                exact_delta_ev=exact_delta_ev,
+            ),
+        )
+        for stat_type, bits, update_lvl, delta_ev, exact_delta_ev in cached
+    }
+
+
+# Natures and characteristics used by the calculation: a sample without
+# nature is checked against all of them.
+_TABLES_KEY = disk_cache.key(
+    tuple((nature.name, nature.increased.name, nature.decreased.name) for nature in Nature),
+    tuple((char.name, char.highest_stat.name, char.rem) for char in Characteristic),
+    CharacteristicData.MOD,
+)
+
+
+def _encode_base_stats(sample: ObsSample) -> tuple[tuple[int, ...], ...]:
+    base_stats = []
+    for obs_stat in sample["obs_stats"]:
+        spec = obs_stat["spec"]
+        if isinstance(spec, Pokemon):
+            spec = spec.value
+        # noinspection PyProtectedMember
+        base_stats.append(tuple(spec._base_stats[stat_type] for stat_type in StatType))
+
+    return tuple(base_stats)
+
+
+def _fingerprint(obs_sample: ObsSample) -> str:
+    """
+    Digest of everything IV sets of a sample depend on, including game data,
+    so that IV sets are calculated again after it's corrected.
+    """
+    return disk_cache.key(_encode_sample(obs_sample), _encode_base_stats(obs_sample), _TABLES_KEY)
+
+
+class _IVSetsStore:
+    """
+    IV sets calculated for a workbook by previous runs, see `disk_cache`.
+
+    Unlike parsed samples, entry is bound to the path rather than to the
+    content of the workbook: samples are matched by their fingerprints, so
+    after editing a few blocks only those are calculated again.
+
+    Entries are ordered from the least to the most recently used one.
+    """
+    # Max number of entries kept when only a part of the workbook is known,
+    # unless more of them are used by the current run.
+    MAX_ENTRIES = 10_000
+
+    def __init__(self, path: Path, sheet_name: Optional[str]):
+        self._key = disk_cache.key("iv_sets", CALC_VERSION, str(path.resolve()), sheet_name)
+        self._entries: dict[str, _CachedIVSets_T] = disk_cache.load(self._key) or {}
+        self._used: set[str] = set()
+        self._changed = False
+
+    def get(self, fingerprint: str) -> Optional[CalcedIVSets_T]:
+        cached = self._entries.pop(fingerprint, None)
+        if cached is None:
+            return None
+
+        self._use(fingerprint, cached)
+        return _decode_iv_sets(cached)
+
+    def add(self, fingerprint: str, iv_sets: CalcedIVSets_T) -> None:
+        cached = self._entries.pop(fingerprint, None)
+        if cached is None:
+            cached = _encode_iv_sets(iv_sets)
+            self._changed = True
+        self._use(fingerprint, cached)
+
+    def _use(self, fingerprint: str, cached: _CachedIVSets_T) -> None:
+        # Move to the end.
+        self._entries[fingerprint] = cached
+        self._used.add(fingerprint)
+
+    def save(self, samples: Optional[list[ObsSample]]) -> None:
+        """
+        Save entries, dropping ones for blocks which are not in `samples`
+        anymore. `None` if only a part of the workbook is known: then the
+        least recently used entries are dropped, see `MAX_ENTRIES`.
+        """
+        entries = self._entries
+        if samples is not None:
+            fingerprints = {_fingerprint(obs_sample) for obs_sample in samples}
+            entries = {
+                fingerprint: cached
+                for fingerprint, cached in self._entries.items()
+                if fingerprint in fingerprints
+            }
+        else:
+            excess = len(entries) - max(self.MAX_ENTRIES, len(self._used))
+            if excess > 0:
+                entries = dict(itertools.islice(entries.items(), excess, None))
+        # Order of entries matters only for pruning, so it's saved only when
+        # they may be pruned later.
+        if self._changed or len(entries) != len(self._entries) or (samples is None and self._used):
+            disk_cache.store(self._key, entries)
+
+
+def _parse_ods(
+    path: str | Path,
+    sheet_name: Optional[str] = None,
+    cache: bool = True,
+) -> list[ObsSample]:
     """
     Parse an observation workbook.
 
@@ -532,7 +736,11 @@ def _parse_ods(path: str | Path, sheet_name: Optional[str] = None) -> list[ObsSa
         path:
             Path to an .ods file.
         sheet_name:
-            Specific sheet to parse. `None` for "all sheets"
+            Specific sheet to parse. `None` for "all sheets" except
+            `OUTPUT_SHEET_NAMES`
+        cache:
+            Reuse result of a previous call for the same workbook content,
+            see `disk_cache`.
 
     Returns:
         Parsed observation samples from all sheets.
@@ -545,31 +753,195 @@ def _parse_ods(path: str | Path, sheet_name: Optional[str] = None) -> list[ObsSa
             Workbook structure is invalid.
     """
     path = Path(path)
+
+    cache_key, samples = _load_cached_samples(path, sheet_name) if cache else (None, None)
+    if samples is not None:
+        return samples
+
+    samples = _parse_selected(path, sheet_name)
+
+    if cache_key is not None:
+        disk_cache.store(cache_key, _encode_samples(samples))
+
+    return samples
+
+
+def _open_document(path: Path) -> ezodf.Document:
     try:
-        document = ezodf.opendoc(str(path))
+        return ezodf.opendoc(str(path))
     except Exception as exc:
         raise OSError(f"Unable to open ODS file {path!s}") from exc
 
+
+def _get_sheet(document: ezodf.Document, sheet_name: str) -> ezodf.Sheet:
+    try:
+        return document.sheets[sheet_name]
+    except KeyError:
+        raise KeyError(f"No sheet named {sheet_name!r} in ODS file")
+    except ValueError as exc:
+        # Sheets are parsed on access, so invalid content is found only here.
+        raise OSError(f"Unable to read sheet {sheet_name!r} of ODS file") from exc
+
+
+def _get_sheet_names(document: ezodf.Document) -> list[str]:
+    """Names of sheets with samples, see `OUTPUT_SHEET_NAMES`."""
+    try:
+        return [name for name in document.sheets if name not in OUTPUT_SHEET_NAMES]
+    except ValueError as exc:
+        raise OSError("Unable to read ODS file") from exc
+
+
+def _iter_sheets(document: ezodf.Document) -> Generator[ezodf.Sheet]:
+    """
+    Sheets with samples in one pass, each one is parsed right before it's
+    yielded, see `OUTPUT_SHEET_NAMES`.
+    """
+    try:
+        for sheet in document.sheets.values():
+            if sheet.name not in OUTPUT_SHEET_NAMES:
+                yield sheet
+    except ValueError as exc:
+        raise OSError("Unable to read ODS file") from exc
+
+
+# Samples to parse: (start index, stop index or `None`, allowed labels or
+# `None`), see `get_samples_iv_sets`.
+_Selection_T = tuple[int, Optional[int], Optional[Collection[Optional[str]]]]
+_ALL_SAMPLES: _Selection_T = (0, None, None)
+
+
+def _parse_selected(
+    path: Path,
+    sheet_name: Optional[str],
+    selection: _Selection_T = _ALL_SAMPLES,
+) -> list[ObsSample]:
+    """
+    Parse only `selection` of samples: blocks are counted while they are
+    discovered, and only labels of blocks within the index range are read.
+    Other blocks are neither parsed nor validated, and sheets after the last
+    selected block are not even opened.
+
+    Returns:
+        Selected samples in the same order as `_parse_ods`.
+
+    Raises:
+        Same as `_parse_ods`.
+    """
+    start, stop, allowed_labels = selection
+    document = _open_document(path)
     if sheet_name is not None:
-        try:
-            sheet = document.sheets[sheet_name]
-        except KeyError:
-            raise KeyError(f"No sheet named {sheet_name!r} in ODS file")
-        return _parse_sheet(sheet)
+        sheets = [_get_sheet(document, sheet_name)]
+    else:
+        sheets = _iter_sheets(document)
 
     samples: list[ObsSample] = []
-    for sheet in document.sheets.values():
-        samples.extend(_parse_sheet(sheet))
+    if stop is not None and stop <= start:
+        return samples
+
+    index = 0
+    for sheet in sheets:
+        for block_row in _iter_block_rows(sheet):
+            if index >= start and (allowed_labels is None or _parse_label(sheet, block_row) in allowed_labels):
+                samples.append(_parse_block(sheet, block_row))
+
+            index += 1
+            if index == stop:
+                return samples
 
     return samples
 
 
+def _select_samples(samples: list[ObsSample], selection: _Selection_T) -> list[ObsSample]:
+    start, stop, allowed_labels = selection
+    return [
+        obs_sample
+        for obs_sample in samples[start:stop]
+        if allowed_labels is None or obs_sample["label"] in allowed_labels
+    ]
+
+
+def _get_samples_cache_key(path: Path, sheet_name: Optional[str], selection: _Selection_T) -> str:
+    """
+    Raises:
+        OSError:
+            Unable to read the file.
+    """
+    start, stop, allowed_labels = selection
+    labels = None if allowed_labels is None else sorted(allowed_labels, key=repr)
+    return disk_cache.file_key(path, "ods", PARSER_VERSION, sheet_name, start, stop, labels)
+
+
+def _load_cached_samples(
+    path: Path,
+    sheet_name: Optional[str],
+    selection: _Selection_T = _ALL_SAMPLES,
+) -> tuple[Optional[str], Optional[list[ObsSample]]]:
+    """
+    Only selected samples are cached, so a selection is served by the entry
+    for the same selection, or by the entry for the whole workbook.
+
+    Returns:
+        (cache key, samples): key of the entry for `selection`, `None` if the
+        file can't be read; samples are `None` unless they are cached.
+    """
+    try:
+        cache_key = _get_samples_cache_key(path, sheet_name, selection)
+        cached: Optional[list[_CachedObsSample_T]] = disk_cache.load(cache_key)
+        if cached is not None:
+            return cache_key, _decode_samples(cached)
+
+        if selection == _ALL_SAMPLES:
+            return cache_key, None
+
+        cached = disk_cache.load(_get_samples_cache_key(path, sheet_name, _ALL_SAMPLES))
+    except OSError:
+        # Let the parser report the problem.
+        return None, None
+
+    if cached is None:
+        return cache_key, None
+
+    return cache_key, _select_samples(_decode_samples(cached), selection)
+
+
+# More chunks than workers even out the load when blocks differ in size.
+_CHUNKS_PER_WORKER = 4
+
+
+def _get_iv_sets(obs_sample: ObsSample) -> CalcedIVSets_T:
+    try:
+        return iv_calc.get_iv_sets(**obs_sample)
+    except vlps.Invalid as e:
+        # `MultipleInvalid` expects a list of errors, not a message.
+        raise vlps.Invalid(f"Problem with sample {obs_sample['label']!r}: {e}") from e
+    except Exception as e:
+        raise type(e)(f"Problem with sample {obs_sample['label']!r}: {e}")
+
+
+def _try_get_iv_sets(obs_sample: ObsSample) -> CalcedIVSets_T | Exception:
+    """
+    Same as `_get_iv_sets`, but error is returned rather than raised, so that
+    the caller could raise it after all the results preceding it.
+    """
+    try:
+        return _get_iv_sets(obs_sample)
+    except Exception as e:
+        return e
+
+
+def _calc_iv_sets_task(obs_sample: ObsSample) -> CalcedIVSets_T | Exception:
+    """Calculate IV sets in a worker process, see `_try_get_iv_sets`."""
+    return _try_get_iv_sets(obs_sample)
+
+
 def get_samples_iv_sets(
     path: str | Path,
     sheet_name: Optional[str] = None,
     skip: int = 0,
     limit: Optional[int] = None,
     allowed_labels: Optional[set[str]] = None,
+    cache: bool = True,
+    workers: Optional[int] = None,
 ) -> Generator[tuple[ObsSample, iv_calc.CalcedIVSets_T]]:
     """
     Parse an observation workbook.
@@ -578,7 +950,8 @@ def get_samples_iv_sets(
         path:
             Path to an .ods file.
         sheet_name:
-            Specific sheet to parse. `None` for "all sheets"
+            Specific sheet to parse. `None` for "all sheets" except
+            `OUTPUT_SHEET_NAMES`
         skip:
             Number of first records to skip
         limit:
@@ -586,6 +959,18 @@ def get_samples_iv_sets(
         allowed_labels:
             Additional filter on top of `skip` + `limit` pair, and applied
             after it.
+        cache:
+            Reuse parsing result of a previous call for the same workbook
+            content, and IV sets of unchanged blocks calculated by previous
+            calls for the same workbook path, see `disk_cache`. Only selected
+            blocks are parsed and cached, for this selection only, while
+            a cached parse of the whole workbook serves any selection.
+        workers:
+            Number of processes to calculate IV sets with. `None` for doing
+            it in this process. Results are yielded in the same order in both
+            cases. The workbook is parsed once, in this process: most of the
+            parsing time is reading the XML of whole sheets, which every
+            process would have to repeat.
 
     Returns:
         Parsed observation samples from all sheets with their iv sets
@@ -597,19 +982,50 @@ def get_samples_iv_sets(
         OdsFormatError:
             Workbook structure is invalid.
     """
-    parsed = _parse_ods(path, sheet_name)
+    path = Path(path)
+    store = _IVSetsStore(path, sheet_name) if cache else None
+
+    selection = (skip, None if limit is None else skip + limit, allowed_labels)
+    cache_key, samples = _load_cached_samples(path, sheet_name, selection) if cache else (None, None)
+    if samples is None:
+        samples = _parse_selected(path, sheet_name, selection)
+        if cache_key is not None:
+            disk_cache.store(cache_key, _encode_samples(samples))
+    # All samples of the workbook, if they are known.
+    parsed = samples if selection == _ALL_SAMPLES else None
+
+    fingerprints = [_fingerprint(obs_sample) for obs_sample in samples] if store is not None else []
+
+    # IV sets which are not calculated here, by sample index.
+    ready: dict[int, CalcedIVSets_T] = {}
+    for i in range(len(samples)):
+        iv_sets = store.get(fingerprints[i]) if store is not None else None
+        if iv_sets is not None:
+            ready[i] = iv_sets
+
+    pending = [obs_sample for i, obs_sample in enumerate(samples) if i not in ready]
+    executor = None
+    if workers is not None and pending:
+        executor = ProcessPoolExecutor(workers)
+        chunk_size = max(1, len(pending) // (workers * _CHUNKS_PER_WORKER))
+        calculated = executor.map(_calc_iv_sets_task, pending, chunksize=chunk_size)
+    else:
+        calculated = map(_get_iv_sets, pending)
 
-    if limit is None:
-        limit = len(parsed)
+    try:
+        for i, obs_sample in enumerate(samples):
+            iv_sets = ready[i] if i in ready else next(calculated)
+            if isinstance(iv_sets, Exception):
+                raise iv_sets
 
-    for i in range(skip, min(skip + limit, len(parsed))):
-        obs_sample = parsed[i]
-        if allowed_labels is not None and obs_sample["label"] not in allowed_labels:
-            continue
-        try:
-            yield obs_sample, iv_calc.get_iv_sets(**obs_sample)
-        except Exception as e:
-            raise type(e)(f"Problem with sample {obs_sample['label']!r}: {e}")
+            if store is not None:
+                store.add(fingerprints[i], iv_sets)
+            yield obs_sample, iv_sets
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if store is not None:
+            store.save(parsed)
 
 
 def minmax_filter_samples_iv_sets(
@@ -645,34 +1061,45 @@ def minmax_filter_samples_iv_sets(
     if len(samples_iv_sets) < 2 or not important_stat_types:
         return iter(samples_iv_sets), []
 
+    best_ivs: list[list[int]] = []
+    worst_ivs: list[list[int]] = []
+    for obs_sample, calced_iv_sets in samples_iv_sets:
+        best, worst = _get_oriented_ivs(calced_iv_sets, important_stat_types)
+        best_ivs.append(best)
+        worst_ivs.append(worst)
+
+    # For every important stat: sorted distinct worst IVs, and bitmasks of
+    # samples whose worst IV is not lower than respective one (j-th bit for
+    # j-th sample) - i.e. of samples that can dominate a sample with such best IV.
+    stat_masks: list[tuple[list[int], list[int]]] = []
+    for k in range(len(important_stat_types)):
+        buckets: dict[int, int] = {}
+        for j, worst in enumerate(worst_ivs):
+            buckets[worst[k]] = buckets.get(worst[k], 0) | (1 << j)
+        values = sorted(buckets)
+        masks = [0] * (len(values) + 1)
+        for pos in range(len(values) - 1, -1, -1):
+            masks[pos] = masks[pos + 1] | buckets[values[pos]]
+        stat_masks.append((values, masks))
+
     # Let's save filtered indices and reference indices they were filtered by.
     filtered_indices: dict[int, int] = dict()
-    for i, (obs_sample, calced_iv_sets) in enumerate(samples_iv_sets):
-        # Check if i-th element can be filtered.
-        best_ivs: dict[StatType, int] = dict()
-        for stat_type, asc in important_stat_types.items():
-            fetcher: Callable = max if asc else min
-            best_ivs[stat_type] = fetcher(calced_iv_sets[stat_type].values)
-
-        for ref_i, (ref_obs_sample, ref_calced_iv_sets) in enumerate(samples_iv_sets):
-            if i == ref_i or ref_i in filtered_indices:
-                # i-th can't be filtered by itself or ref_i-th sample, if
-                # ref_i-th sample was already filtered out by i-th.
-                # I.e. no cycles in filtering graph, otherwise we'll lose data.
-                continue
-
-            for stat_type, asc in important_stat_types.items():
-                fetcher: Callable = min if asc else max
-                worst_ref_iv = fetcher(ref_calced_iv_sets[stat_type].values)
-                if best_ivs[stat_type] > worst_ref_iv:
-                    # i-th element can NOT be filtered by current reference.
-                    # Go to the next reference candidate.
-                    break
-            else:
-                # We didn't break. I.e. `obs_sample` can NOT be better than
-                # `ref_obs_sample` and should be filtered out.
-                filtered_indices[i] = ref_i
+    # Samples which can be used as a reference.
+    refs_mask = (1 << len(samples_iv_sets)) - 1
+    for i, best in enumerate(best_ivs):
+        # i-th can't be filtered by itself or ref_i-th sample, if ref_i-th
+        # sample was already filtered out by i-th.
+        # I.e. no cycles in filtering graph, otherwise we'll lose data.
+        refs = refs_mask & ~(1 << i)
+        for (values, masks), iv in zip(stat_masks, best):
+            refs &= masks[bisect.bisect_left(values, iv)]
+            if not refs:
                 break
+        else:
+            # `obs_sample` can NOT be better than any of `refs`: take the first
+            # one as a reference and filter it out.
+            filtered_indices[i] = (refs & -refs).bit_length() - 1
+            refs_mask &= ~(1 << i)
 
     good_sample_iv_sets = (
         element
@@ -687,6 +1114,103 @@ def minmax_filter_samples_iv_sets(
     return good_sample_iv_sets, filtered_labels
 
 
+def _get_oriented_ivs(
+    calced_iv_sets: CalcedIVSets_T,
+    important_stat_types: dict[StatType, bool],
+) -> tuple[list[int], list[int]]:
+    """
+    Returns:
+        (best IVs, worst IVs) in important stats, oriented so that higher
+        is better: IVs of stats we want low are negated.
+    """
+    best, worst = [], []
+    for stat_type, asc in important_stat_types.items():
+        values = calced_iv_sets[stat_type].values
+        if asc:
+            best.append(values.max)
+            worst.append(values.min)
+        else:
+            best.append(-values.min)
+            worst.append(-values.max)
+
+    return best, worst
+
+
+def _can_not_be_better(best: list[int], ref_worst: list[int]) -> bool:
+    return all(iv <= ref_iv for iv, ref_iv in zip(best, ref_worst))
+
+
+def stream_minmax_filter_samples_iv_sets(
+    samples_iv_sets: Iterable[tuple[ObsSample, CalcedIVSets_T]],
+    important_stat_types: Optional[dict[StatType, bool]] = None,
+    on_filtered: Optional[Callable[[Optional[str], Optional[str]], None]] = None,
+) -> Generator[tuple[ObsSample, CalcedIVSets_T]]:
+    """
+    Streaming version of `minmax_filter_samples_iv_sets`.
+
+    Only the frontier - samples which were not filtered out so far - is kept
+    in memory. Sample is yielded as soon as no following sample can filter it
+    out, i.e. its worst IVs are the best possible ones in all important stats.
+    Other survivors are yielded at the end of the stream in their original
+    order.
+
+    `on_filtered` is called with labels of every filtered sample and its
+    reference as soon as the sample is filtered out.
+
+    References are always taken from the frontier, so they can differ from
+    ones reported by `minmax_filter_samples_iv_sets`. Same for samples which
+    can't be better than each other (e.g. with the same exact IVs): here the
+    first of them survives, not the last one.
+    """
+    if important_stat_types is None:
+        important_stat_types = {stat_type: True for stat_type in StatType}
+
+    if not important_stat_types:
+        yield from samples_iv_sets
+        return
+
+    best_possible = [
+        Stat.IV_RANGE.max if asc else -Stat.IV_RANGE.min
+        for asc in important_stat_types.values()
+    ]
+    # Not filtered samples by their index: (element, best IVs, worst IVs, if it
+    # was yielded already).
+    frontier: dict[int, tuple[tuple[ObsSample, CalcedIVSets_T], list[int], list[int], bool]] = {}
+    for i, element in enumerate(samples_iv_sets):
+        best, worst = _get_oriented_ivs(element[1], important_stat_types)
+
+        ref = next((
+            ref_element
+            for ref_element, _, ref_worst, _ in frontier.values()
+            if _can_not_be_better(best, ref_worst)
+        ), None)
+        if ref is not None:
+            if on_filtered is not None:
+                on_filtered(element[0]["label"], ref[0]["label"])
+            continue
+
+        # Frontier samples can't filter each other, and a sample which can't
+        # be filtered can't be filtered by the new one too.
+        dominated = [
+            j
+            for j, (_, ref_best, _, _) in frontier.items()
+            if _can_not_be_better(ref_best, worst)
+        ]
+        for j in dominated:
+            ref_element = frontier.pop(j)[0]
+            if on_filtered is not None:
+                on_filtered(ref_element[0]["label"], element[0]["label"])
+
+        final = worst == best_possible
+        if final:
+            yield element
+        frontier[i] = (element, best, worst, final)
+
+    for element, _, _, final in frontier.values():
+        if not final:
+            yield element
+
+
 def _test_filter() -> None:
     important_stat_types = {
         StatType.HP: True,
@@ -754,6 +1278,7 @@ def pprint_sample_iv_sets(
     color_mode: iv_calc.ColorMode = "max",
     important_stat_types: Optional[Container[StatType]] = None,
     print_only_important: bool = True,
+    file: Optional[TextIO] = None,
 ) -> None:
     label, name, nature, characteristic = (
         obs_sample["label"], obs_sample['spec'].name, obs_sample["nature"], obs_sample["characteristic"]
@@ -762,14 +1287,85 @@ def pprint_sample_iv_sets(
         nature = nature.name
     if characteristic is not None:
         characteristic = characteristic.name
-    print(f"{label}: {name}({nature=}, {characteristic=})")
-    iv_calc.pprint_iv_sets(iv_sets, color_mode, important_stat_types, print_only_important)
+    print(f"{label}: {name}({nature=}, {characteristic=})", file=file)
+    iv_calc.pprint_iv_sets(iv_sets, color_mode, important_stat_types, print_only_important, file)
 
 
-def pprint_filtered_labels(filtered_labels: list[tuple[Optional[str], Optional[str]]]) -> None:
-    print("Filtered samples:")
+def pprint_filtered_labels(
+    filtered_labels: list[tuple[Optional[str], Optional[str]]],
+    file: Optional[TextIO] = None,
+) -> None:
+    print("Filtered samples:", file=file)
     for label, ref_label in filtered_labels:
-        print(f"{label} ≤ {ref_label}")
+        print(f"{label} ≤ {ref_label}", file=file)
+
+
+def _results_rows(
+    samples_iv_sets: Iterable[tuple[ObsSample, CalcedIVSets_T]],
+    filtered_labels: Iterable[tuple[Optional[str], Optional[str]]] = (),
+) -> Generator[list[object]]:
+    """Rows of the results sheet, see `write_ods_results`."""
+    header: list[object] = ["LABEL", "POKEMON", "NATURE", "CHARACTERISTIC"]
+    for stat_type in StatType:
+        header += [
+            stat_type.name,
+            f"{stat_type.name} UPDATE LVL",
+            f"{stat_type.name} DELTA EV",
+            f"{stat_type.name} EXACT DELTA EV",
+        ]
+    yield header
+
+    for obs_sample, iv_sets in samples_iv_sets:
+        nature, characteristic = obs_sample["nature"], obs_sample["characteristic"]
+        row: list[object] = [
+            obs_sample["label"],
+            obs_sample["spec"].name,
+            None if nature is None else nature.name,
+            None if characteristic is None else characteristic.name,
+        ]
+        for stat_type in StatType:
+            calced_iv_set = iv_sets[stat_type]
+            row += [
+                iv_calc.get_iv_set_str(calced_iv_set.values),
+                calced_iv_set.suggestion.update_lvl,
+                calced_iv_set.suggestion.delta_ev,
+                calced_iv_set.suggestion.exact_delta_ev,
+            ]
+        yield row
+
+    first = True
+    for label, ref_label in filtered_labels:
+        if first:
+            yield []
+            yield ["FILTERED", "REFERENCE"]
+            first = False
+        yield [label, ref_label]
+
+
+def write_ods_results(
+    path: str | Path,
+    output_path: str | Path,
+    samples_iv_sets: Iterable[tuple[ObsSample, CalcedIVSets_T]],
+    filtered_labels: Iterable[tuple[Optional[str], Optional[str]]] = (),
+    sheet_name: str = RESULTS_SHEET_NAME,
+) -> None:
+    """
+    Write a copy of the workbook with results in a separate sheet.
+
+    One row per sample: label, species, nature and characteristic, then IV
+    set and suggestions for each stat. Labels of filtered samples (see
+    `minmax_filter_samples_iv_sets`) follow together with their references.
+    Results are streamed into the copy as they are computed, see
+    `ezodf.write_sheet`.
+
+    Raises:
+        OSError:
+            The file cannot be read or written.
+
+        ValueError:
+            The file is not a valid ODS document.
+    """
+    ezodf.write_sheet(path, output_path, sheet_name, _results_rows(samples_iv_sets, filtered_labels))
 
 
 def process_ods_with_filter(
@@ -782,20 +1378,191 @@ def process_ods_with_filter(
     minmax_filter: bool = True,
     color_mode: iv_calc.ColorMode = "max",
     print_only_important: bool = True,
+    output_path: Optional[Path | str] = None,
+    workers: Optional[int] = None,
+    sink: Optional["sinks.Sink"] = None,
 ) -> None:
-    samples_iv_sets = get_samples_iv_sets(path, sheet_name, skip, limit, allowed_labels)
+    """
+    Calculate IV sets of samples from the workbook and print them.
+    If `output_path` is specified, results are written to the copy of the
+    workbook there instead, see `write_ods_results`. If `sink` is specified,
+    results are written to it instead (see `sinks`), and `color_mode` and
+    printing options are ignored.
+    `workers` are passed to `get_samples_iv_sets`.
+    """
+    samples_iv_sets = get_samples_iv_sets(path, sheet_name, skip, limit, allowed_labels, workers=workers)
+    _output_results(
+        path,
+        samples_iv_sets,
+        important_stat_types,
+        minmax_filter,
+        color_mode,
+        print_only_important,
+        output_path,
+        sink,
+    )
+
 
+def _output_results(
+    path: Path | str,
+    samples_iv_sets: Iterable[tuple[ObsSample, CalcedIVSets_T]],
+    important_stat_types: Optional[dict[StatType, bool]],
+    minmax_filter: bool,
+    color_mode: iv_calc.ColorMode,
+    print_only_important: bool,
+    output_path: Optional[Path | str],
+    sink: Optional["sinks.Sink"],
+) -> None:
+    """
+    Filter and output results of `process_ods_with_filter`: samples are
+    filtered as they come (see `stream_minmax_filter_samples_iv_sets`), and
+    printed or written to `sink` as soon as they are known.
+    """
+    filtered_labels: list[tuple[Optional[str], Optional[str]]] = []
     if minmax_filter:
-        samples_iv_sets, filtered_labels = minmax_filter_samples_iv_sets(samples_iv_sets, important_stat_types)
-        if filtered_labels:
-            pprint_filtered_labels(filtered_labels)
-        print()
+        if output_path is not None:
+            # Results sheet lists filtered samples after all the others.
+            def on_filtered(label: Optional[str], ref_label: Optional[str]) -> None:
+                filtered_labels.append((label, ref_label))
+        elif sink is not None:
+            on_filtered = sink.write_filtered
+        else:
+            on_filtered = _print_filtered_label
+        samples_iv_sets = stream_minmax_filter_samples_iv_sets(samples_iv_sets, important_stat_types, on_filtered)
+
+    if output_path is not None:
+        write_ods_results(path, output_path, samples_iv_sets, filtered_labels)
+        return
+
+    if sink is not None:
+        for obs_sample, iv_sets in samples_iv_sets:
+            sink.write_sample(obs_sample, iv_sets)
+        return
 
     for obs_sample, iv_sets in samples_iv_sets:
         pprint_sample_iv_sets(obs_sample, iv_sets, color_mode, important_stat_types, print_only_important)
         print()
 
 
+def _print_filtered_label(label: Optional[str], ref_label: Optional[str]) -> None:
+    print(f"Filtered sample: {label} ≤ {ref_label}")
+
+
+def _get_stamp(path: Path) -> Optional[tuple[int, int]]:
+    """Size and mtime of the file, `None` if it doesn't exist (yet)."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _calc_watched_iv_sets(
+    path: Path,
+    sheet_name: Optional[str],
+    selection: _Selection_T,
+    iv_sets_by_fingerprint: dict[str, CalcedIVSets_T | Exception],
+) -> list[tuple[ObsSample, CalcedIVSets_T]]:
+    """
+    Parse `selection` of samples (see `_parse_selected`) and get their IV
+    sets, calculating only ones which are not in `iv_sets_by_fingerprint`
+    yet. Afterwards, it contains IV sets of the parsed samples only.
+    """
+    samples = _parse_selected(path, sheet_name, selection)
+    fingerprints = [_fingerprint(obs_sample) for obs_sample in samples]
+    current = {
+        fingerprint: (
+            iv_sets_by_fingerprint[fingerprint]
+            if fingerprint in iv_sets_by_fingerprint
+            else _try_get_iv_sets(obs_sample)
+        )
+        for obs_sample, fingerprint in zip(samples, fingerprints)
+    }
+    # Forget removed and changed blocks.
+    iv_sets_by_fingerprint.clear()
+    iv_sets_by_fingerprint.update(current)
+
+    samples_iv_sets = []
+    for obs_sample, fingerprint in zip(samples, fingerprints):
+        iv_sets = current[fingerprint]
+        if isinstance(iv_sets, Exception):
+            raise iv_sets
+        samples_iv_sets.append((obs_sample, iv_sets))
+
+    return samples_iv_sets
+
+
+def watch_ods_with_filter(
+    path: Path | str,
+    sheet_name: Optional[str] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    allowed_labels: Optional[set[str]] = None,
+    important_stat_types: Optional[dict[StatType, bool]] = None,
+    minmax_filter: bool = True,
+    color_mode: iv_calc.ColorMode = "max",
+    print_only_important: bool = True,
+    interval: float = WATCH_INTERVAL,
+) -> None:
+    """
+    Same as `process_ods_with_filter`, but results are printed again every
+    time the workbook is saved, until interrupted (Ctrl+C).
+
+    The workbook is checked every `interval` seconds. IV sets are kept in
+    memory between saves, so only blocks which were added or changed since
+    the previous save are calculated again. The workbook itself is parsed
+    again on every save: the whole content of the file is rewritten anyway.
+
+    Problems with the workbook (e.g. a half-filled block, an invalid EV,
+    a renamed sheet, or a file which is still being written) are printed
+    once, and the workbook is read again until it succeeds or the workbook is
+    saved again.
+    """
+    path = Path(path).expanduser()
+    selection = (skip, None if limit is None else skip + limit, allowed_labels)
+    iv_sets_by_fingerprint: dict[str, CalcedIVSets_T | Exception] = {}
+    # Stamp of the last version with printed results.
+    stamp = None
+    # Stamp and error message of the last failed attempt.
+    failure: Optional[tuple[tuple[int, int], str]] = None
+    try:
+        while True:
+            new_stamp = _get_stamp(path)
+            if new_stamp is None or new_stamp == stamp:
+                time.sleep(interval)
+                continue
+
+            try:
+                samples_iv_sets = _calc_watched_iv_sets(path, sheet_name, selection, iv_sets_by_fingerprint)
+            # Workbook is being edited: whatever is wrong with it, should be
+            # fixed by one of the next saves.
+            except (OSError, ValueError, RuntimeError, KeyError, vlps.Invalid) as e:
+                message = f"{type(e).__name__}: {e}"
+                if failure != (new_stamp, message):
+                    failure = (new_stamp, message)
+                    print(f"===== {path.name} @ {datetime.now():%H:%M:%S} =====")
+                    print(message)
+                    print()
+                time.sleep(interval)
+                continue
+
+            stamp = new_stamp
+            failure = None
+            print(f"===== {path.name} @ {datetime.now():%H:%M:%S} =====")
+            _output_results(
+                path,
+                samples_iv_sets,
+                important_stat_types,
+                minmax_filter,
+                color_mode,
+                print_only_important,
+                output_path=None,
+                sink=None,
+            )
+    except KeyboardInterrupt:
+        pass
+
+
 def main():
     ...
     # note: total MAGIKARP: 173
@@ -1,4 +1,4 @@
-from enum import Enum
+from enum import Enum, pickle_by_enum_name
 
 from pkmn_stat_type import StatType
 
@@ -32,6 +32,8 @@ class Nature(Enum):
 	def is_simple(self) -> bool:
 		return self.value.is_simple()
 
+	__reduce_ex__ = pickle_by_enum_name
+
 	HARDY   = NatureData(StatType.ATK,   StatType.ATK)
 	LONELY  = NatureData(StatType.ATK,   StatType.DEF)
 	ADAMANT = NatureData(StatType.ATK,   StatType.SPATK)
@@ -0,0 +1,160 @@
+import dataclasses
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Optional, TextIO
+
+import ezodf
+import iv_calc_ods
+from ods_gen import generate_workbook
+
+DEFAULT_SIZES = (10, 1_000, 100_000)
+
+
+@dataclasses.dataclass
+class BenchmarkResult:
+    blocks: int
+    file_size: int
+    # Seconds.
+    open_time: float   # `ezodf.opendoc` + loading of all sheets
+    # `iv_calc_ods.get_samples_iv_sets`: parsing is done before the first
+    # sample is returned, IV sets are calculated afterwards.
+    parse_time: float
+    calc_time: float
+    total_time: float
+    # Peak memory allocated by Python by `get_samples_iv_sets`, bytes (`None`
+    # if not measured).
+    total_peak: Optional[int] = None
+
+
+def _timed[T](func: Callable[[], T]) -> tuple[T, float]:
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def _peak(func: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _open_all(path: Path) -> None:
+    for _ in ezodf.opendoc(path).sheets.values():
+        pass
+
+
+def _get_all(path: Path, workers: Optional[int]) -> int:
+    """Returns: number of samples."""
+    return sum(1 for _ in iv_calc_ods.get_samples_iv_sets(path, cache=False, workers=workers))
+
+
+def _timed_get_all(path: Path, workers: Optional[int]) -> tuple[int, float, float]:
+    """
+    Returns:
+        (number of samples, seconds until the first sample, seconds in total).
+    """
+    start = time.perf_counter()
+    samples_iv_sets = iv_calc_ods.get_samples_iv_sets(path, cache=False, workers=workers)
+    count = 0
+    first_time = None
+    for _ in samples_iv_sets:
+        if first_time is None:
+            first_time = time.perf_counter() - start
+        count += 1
+    total_time = time.perf_counter() - start
+
+    return count, total_time if first_time is None else first_time, total_time
+
+
+def benchmark_workbook(
+    path: str | Path,
+    workers: Optional[int] = None,
+    memory: bool = True,
+) -> BenchmarkResult:
+    """
+    Measure how long it takes to open, parse and calculate IV sets of an
+    observation workbook. Caches are not used.
+
+    If `memory` is set, everything is repeated under `tracemalloc` to find
+    peak memory: it's way slower, so timings are taken from the first run.
+    Memory of worker processes is not included.
+    """
+    path = Path(path).expanduser()
+    _, open_time = _timed(lambda: _open_all(path))
+    blocks, first_time, total_time = _timed_get_all(path, workers)
+    result = BenchmarkResult(
+        blocks=blocks,
+        file_size=path.stat().st_size,
+        open_time=open_time,
+        parse_time=first_time,
+        calc_time=total_time - first_time,
+        total_time=total_time,
+    )
+
+    if memory:
+        result.total_peak = _peak(lambda: _get_all(path, workers))
+
+    return result
+
+
+def run_benchmark(
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    sheets: int = 1,
+    levels: int = 3,
+    workers: Optional[int] = None,
+    memory: bool = True,
+    seed: int = 0,
+) -> list[BenchmarkResult]:
+    """
+    Benchmark synthetic workbooks (see `ods_gen.generate_workbook`) of
+    different `sizes` (total number of blocks, split evenly between `sheets`),
+    see `benchmark_workbook`.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            path = Path(tmp_dir) / f"{size}.ods"
+            generate_workbook(path, sheets=sheets, blocks=max(1, size // sheets), levels=levels, seed=seed)
+            results.append(benchmark_workbook(path, workers, memory))
+            path.unlink()
+
+    return results
+
+
+def _format_size(size: Optional[int]) -> str:
+    if size is None:
+        return "-"
+    return f"{size / (1 << 20):.1f} MiB"
+
+
+def print_results(results: Iterable[BenchmarkResult], file: Optional[TextIO] = None) -> None:
+    header = ("BLOCKS", "FILE", "OPEN", "PARSE", "CALC", "TOTAL", "PEAK")
+    rows = [
+        (
+            str(result.blocks),
+            _format_size(result.file_size),
+            f"{result.open_time:.3f} s",
+            f"{result.parse_time:.3f} s",
+            f"{result.calc_time:.3f} s",
+            f"{result.total_time:.3f} s",
+            _format_size(result.total_peak),
+        )
+        for result in results
+    ]
+    widths = [max(len(row[i]) for row in (header, *rows)) for i in range(len(header))]
+    for row in (header, *rows):
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)), file=file)
+
+
+def main():
+    print_results(run_benchmark())
+
+
+if __name__ == '__main__':
+    main()
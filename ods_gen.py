@@ -0,0 +1,280 @@
+import io
+import random
+from collections.abc import Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import IO, Optional
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, ZIP_STORED
+from xml.sax.saxutils import escape, quoteattr
+
+from characteristic import Characteristic, CharacteristicData
+from iv_calc_ods import BLOCK_HEIGHT
+from nature import Nature
+from pkmn_stat import Stat, LVL_RANGE
+from pkmn_stat_type import StatType
+from pokemon import Pokemon, Sample
+
+_MIMETYPE = "application/vnd.oasis.opendocument.spreadsheet"
+_MANIFEST = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0" manifest:version="1.2">'
+    f'<manifest:file-entry manifest:full-path="/" manifest:media-type="{_MIMETYPE}"/>'
+    '<manifest:file-entry manifest:full-path="content.xml" manifest:media-type="text/xml"/>'
+    '</manifest:manifest>'
+)
+_CONTENT_START = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<office:document-content'
+    ' xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"'
+    ' xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"'
+    ' xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0"'
+    ' office:version="1.2"><office:body><office:spreadsheet>'
+)
+_CONTENT_END = "</office:spreadsheet></office:body></office:document-content>"
+
+# Size of a LibreOffice sheet: saved documents often end with an empty row
+# repeated up to the last one.
+_MAX_ROWS = 1 << 20
+_MAX_COLS = 1 << 14
+
+# Species used by default, with their evolutions (if any).
+EVOLUTIONS: Mapping[Pokemon, Optional[Pokemon]] = {
+    Pokemon.MAGIKARP: Pokemon.GYARADOS,
+    Pokemon.TOTODILE: None,
+    Pokemon.ARON: Pokemon.LAIRON,
+    Pokemon.LAIRON: Pokemon.AGGRON,
+    Pokemon.SHROOMISH: Pokemon.BRELOOM,
+}
+
+_CHARACTERISTICS = {
+    (characteristic.highest_stat, characteristic.rem): characteristic
+    for characteristic in Characteristic
+}
+
+_EMPTY_CELL = "<table:table-cell/>"
+_COVERED_CELL = "<table:covered-table-cell/>"
+
+
+def _cell(value: Optional[str | int] = None, cols: int = 1, rows: int = 1) -> str:
+    attrs = ""
+    if cols > 1:
+        attrs += f' table:number-columns-spanned="{cols}"'
+    if rows > 1:
+        attrs += f' table:number-rows-spanned="{rows}"'
+
+    if value is None:
+        return f"<table:table-cell{attrs}/>"
+    if isinstance(value, int):
+        return f'<table:table-cell office:value-type="float" office:value="{value}"{attrs}/>'
+    return f'<table:table-cell office:value-type="string"{attrs}><text:p>{escape(value)}</text:p></table:table-cell>'
+
+
+def _empty_rows(count: int, cols: int) -> str:
+    return (
+        f'<table:table-row table:number-rows-repeated="{count}">'
+        f'<table:table-cell table:number-columns-repeated="{cols}"/>'
+        "</table:table-row>"
+    )
+
+
+def _get_characteristic(rng: random.Random, ivs: Mapping[StatType, int]) -> Characteristic:
+    highest_iv = max(ivs.values())
+    # Ties are resolved by personality value, which is random enough.
+    highest_stat = rng.choice([stat_type for stat_type in StatType if ivs[stat_type] == highest_iv])
+    return _CHARACTERISTICS[highest_stat, highest_iv % CharacteristicData.MOD]
+
+
+def _block_columns(
+    rng: random.Random,
+    label: str,
+    evolutions: Mapping[Pokemon, Optional[Pokemon]],
+    levels: int,
+) -> list[Sequence[str]]:
+    """
+    Columns of a data block for a random Pokémon with random IVs, observed at
+    `levels` random levels, see `iv_calc_ods._parse_ods`.
+    """
+    spec = rng.choice(list(evolutions))
+    nature = rng.choice(list(Nature))
+    ivs = {stat_type: rng.randint(Stat.IV_RANGE.min, Stat.IV_RANGE.max) for stat_type in StatType}
+    characteristic = _get_characteristic(rng, ivs)
+    evs = dict.fromkeys(StatType, 0)
+    stat_order = list(StatType)
+    rng.shuffle(stat_order)
+
+    columns: list[Sequence[str]] = [
+        [_cell(label, rows=BLOCK_HEIGHT), *[_COVERED_CELL] * (BLOCK_HEIGHT - 1)],
+        [
+            _cell("POKEMON"), _cell(spec.name),
+            _cell("NATURE"), _cell(nature.name),
+            _cell("CHARACTERISTIC"), _cell(characteristic.name),
+            # Ignored cells.
+            _cell(f"{spec.value.name}, {nature.name.lower()}"), _EMPTY_CELL,
+        ],
+        [
+            _cell(rng.choice(["LEVEL:", "LEVEL", "lvl", "LVL:"])), _EMPTY_CELL,
+            *(_cell(stat_type.name) for stat_type in stat_order),
+        ],
+    ]
+
+    lvl = rng.randint(LVL_RANGE.min, LVL_RANGE.max - levels + 1)
+    evolve_at = rng.randrange(1, levels) if levels > 1 and evolutions[spec] is not None else None
+    for level_index in range(levels):
+        if level_index == evolve_at:
+            spec = evolutions[spec]
+            columns.append([_cell("POKEMON"), _cell(spec.name), *[_EMPTY_CELL] * (BLOCK_HEIGHT - 2)])
+
+        if level_index:
+            # Leave room for the remaining levels.
+            lvl += rng.randint(1, max(1, (LVL_RANGE.max - lvl) // (levels - level_index)))
+            for stat_type in StatType:
+                gained = min(rng.choice((0, 0, 1, 2, 5)), Sample.MAX_EVS - sum(evs.values()))
+                evs[stat_type] = min(Stat.EV_RANGE.max, evs[stat_type] + gained)
+
+        values = {
+            stat_type: Stat.calc_val(
+                stat_type,
+                spec.value._base_stats[stat_type],
+                lvl,
+                ivs[stat_type],
+                evs[stat_type],
+                None if stat_type == StatType.HP else Stat.get_mult(stat_type, nature),
+            )
+            for stat_type in StatType
+        }
+        total_column = [_cell("TOTAL")]
+        ev_column = [_cell("EV")]
+        for stat_type in stat_order:
+            total_column.append(_cell(values[stat_type]))
+            # Zero EVs are usually left empty.
+            ev_column.append(_cell(evs[stat_type] or rng.choice((0, None))))
+
+        level_columns = [total_column, ev_column]
+        rng.shuffle(level_columns)
+        level_columns[0].insert(0, _cell(lvl, cols=2))
+        level_columns[1].insert(0, _COVERED_CELL)
+        columns += level_columns
+
+    if rng.random() < 0.3:
+        # Level block prepared for a future observation: ignored.
+        columns += [
+            [_cell(cols=2), _cell("TOTAL"), *[_EMPTY_CELL] * (BLOCK_HEIGHT - 2)],
+            [_COVERED_CELL, _cell("EV"), *[_EMPTY_CELL] * (BLOCK_HEIGHT - 2)],
+        ]
+
+    return columns
+
+
+def _iter_sheet_xml(
+    rng: random.Random,
+    name: str,
+    first_label: int,
+    blocks: int,
+    evolutions: Mapping[Pokemon, Optional[Pokemon]],
+    levels: int,
+    trailing_rows: bool,
+) -> Iterator[str]:
+    yield f"<table:table table:name={quoteattr(name)}>"
+    yield f'<table:table-column table:number-columns-repeated="{_MAX_COLS}"/>'
+    rows = 0
+    for block_index in range(blocks):
+        columns = _block_columns(rng, f"S{first_label + block_index}", evolutions, levels)
+        for row in range(BLOCK_HEIGHT):
+            yield f"<table:table-row>{''.join(column[row] for column in columns)}</table:table-row>"
+        rows += BLOCK_HEIGHT
+
+        gap = rng.choice((0, 0, 1, 3))
+        if gap:
+            yield _empty_rows(gap, rng.randint(1, len(columns)))
+            rows += gap
+
+    if trailing_rows and rows < _MAX_ROWS:
+        yield _empty_rows(_MAX_ROWS - rows, _MAX_COLS)
+    yield "</table:table>"
+
+
+def _write_content(
+    out: IO[str],
+    rng: random.Random,
+    sheets: int,
+    blocks: int,
+    evolutions: Mapping[Pokemon, Optional[Pokemon]],
+    levels: int,
+    trailing_rows: bool,
+) -> None:
+    out.write(_CONTENT_START)
+    for sheet_index in range(sheets):
+        for xml in _iter_sheet_xml(
+            rng, f"Sheet{sheet_index + 1}", sheet_index * blocks + 1, blocks, evolutions, levels, trailing_rows
+        ):
+            out.write(xml)
+    out.write(_CONTENT_END)
+
+
+def generate_workbook(
+    path: str | Path,
+    sheets: int = 1,
+    blocks: int = 10,
+    levels: int = 3,
+    seed: int = 0,
+    evolutions: Mapping[Pokemon, Optional[Pokemon]] = EVOLUTIONS,
+    trailing_rows: bool = True,
+) -> None:
+    """
+    Write a synthetic observation workbook, see `iv_calc_ods._parse_ods`.
+
+    Every data block describes a random Pokémon (with random IVs, nature and
+    consistent characteristic) observed at `levels` increasing levels, with
+    EVs growing along the way, so IV sets of every block can be calculated.
+    Blocks use everything the layout allows: merged label and level cells,
+    shuffled stat order and TOTAL/EV columns, empty EV cells, evolution
+    columns, ignored empty level blocks and empty rows between blocks.
+
+    content.xml is streamed to the archive, so workbooks of any size can be
+    written.
+
+    Args:
+        path:
+            Path to the resulting .ods file.
+        sheets:
+            Number of sheets, named "Sheet1", "Sheet2", ...
+        blocks:
+            Number of data blocks per sheet. Blocks are labeled "S1", "S2",
+            ... through all sheets.
+        levels:
+            Number of observed levels per block.
+        seed:
+            Seed of the random generator: the same arguments give the same
+            workbook.
+        evolutions:
+            Species to pick from, with their evolutions (or `None`).
+            Evolution happens at a random level of a block.
+        trailing_rows:
+            End every sheet with an empty row repeated up to the last row
+            of a sheet, like LibreOffice does.
+
+    Raises:
+        OSError:
+            Unable to write the file.
+    """
+    max_levels = LVL_RANGE.max - LVL_RANGE.min + 1
+    if not 1 <= levels <= max_levels:
+        raise ValueError(f"levels should be in [1, {max_levels}], got {levels}")
+
+    rng = random.Random(seed)
+    with ZipFile(Path(path).expanduser(), "w", ZIP_DEFLATED) as archive:
+        # "mimetype" has to be the first entry and uncompressed.
+        archive.writestr(ZipInfo("mimetype"), _MIMETYPE, compress_type=ZIP_STORED)
+        archive.writestr("META-INF/manifest.xml", _MANIFEST)
+        with (
+            archive.open("content.xml", "w") as content,
+            io.TextIOWrapper(content, encoding="utf-8") as out,
+        ):
+            _write_content(out, rng, sheets, blocks, evolutions, levels, trailing_rows)
+
+
+def main():
+    generate_workbook('~/Documents/pkmn/samples/synthetic.ods', sheets=2, blocks=100)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 from copy import copy
 from dataclasses import dataclass
+from enum import IntEnum
 from fractions import Fraction
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
 import voluptuous as vlps
 
@@ -12,6 +13,10 @@ from utils import enum_const_dict, multiplier_range_frac, IntRange, IntOrRange_T
 	FloatOrRange_T
 from nature import Nature
 
+if TYPE_CHECKING:
+	import numpy as np
+	from numpy.typing import ArrayLike
+
 
 LVL_RANGE = IntRange(1, 100)
 # Used in formulas
@@ -95,6 +100,15 @@ InputStatsData_T = dict[
 NatureMult_T = int | Fraction
 
 
+class MultCode(IntEnum):
+	"""Nature multiplier as an integer for array functions, see `Stat.get_iv_bounds_batch`."""
+	HP = 0  # no multiplier
+	DEFAULT = 1
+	INCREASED = 2
+	DECREASED = 3
+	UNKNOWN = 4  # non-HP stat with unknown multiplier, see `Stat.MULT_RANGE`
+
+
 class Stat:
 	BASE_RANGE = IntRange(0, 256)
 	IV_RANGE = IntRange(0, 31)
@@ -119,6 +133,19 @@ class Stat:
 		else:
 			return cls.DEFAULT_MULT
 
+	@classmethod
+	def get_mult_code(cls, type_: StatType, mult: Optional[NatureMult_T]) -> MultCode:
+		if type_ == StatType.HP:
+			return MultCode.HP
+		elif mult is None:
+			return MultCode.UNKNOWN
+		elif mult == cls.INCREASED_MULT:
+			return MultCode.INCREASED
+		elif mult == cls.DECREASED_MULT:
+			return MultCode.DECREASED
+		else:
+			return MultCode.DEFAULT
+
 	def __init__(
 		self,
 		type_: StatType,
@@ -164,9 +191,9 @@ class Stat:
 				self._val: IntOrRange_T = vlps.Schema(vlps.All(int, self.calc_val(
 					self._type,
 					self._base,
+					self._lvl,
 					self._iv,
 					self._ev,
-					self._lvl,
 					self._mult
 				).in_validator))(val)
 			except vlps.Error as e:
@@ -337,6 +364,180 @@ class Stat:
 
 		return range_
 
+	# Fast paths of `calc_val` and `get_iv` for plain integers. They repeat
+	# the range arithmetic of `utils` step by step, so results are exactly
+	# the same.
+
+	@classmethod
+	def calc_val_bounds(
+		cls,
+		type_: StatType,
+		base: int,
+		lvl: int,
+		ev: Optional[int],
+		mult: Optional[NatureMult_T]
+	) -> tuple[int, int]:
+		"""
+		Same as `calc_val` for any IV, but without `IntRange`s and validation.
+		`ev` and `mult` are `None` if unknown (`mult` is not used for HP).
+
+		Returns:
+			(min value, max value)
+		"""
+		if ev is None:
+			min_part = 2*base + cls.IV_RANGE.min + cls.EV_RANGE.min//4
+			max_part = 2*base + cls.IV_RANGE.max + cls.EV_RANGE.max//4
+		else:
+			min_part = 2*base + cls.IV_RANGE.min + ev//4
+			max_part = 2*base + cls.IV_RANGE.max + ev//4
+
+		if type_ == StatType.HP:
+			return min_part*lvl//LVL_NORM + lvl + 10, max_part*lvl//LVL_NORM + lvl + 10
+
+		min_val = min_part*lvl//LVL_NORM + 5
+		max_val = max_part*lvl//LVL_NORM + 5
+		if mult is None:
+			numerator, denominator = cls.MULT_RANGE.numerator, cls.MULT_RANGE.denominator
+			return min_val*numerator.min//denominator, max_val*numerator.max//denominator
+		if mult != cls.DEFAULT_MULT:
+			return min_val*mult.numerator//mult.denominator, max_val*mult.numerator//mult.denominator
+
+		return min_val, max_val
+
+	@classmethod
+	def get_iv_bounds(
+		cls,
+		type_: StatType,
+		base: int,
+		lvl: int,
+		val: int,
+		ev: Optional[int],
+		mult: Optional[NatureMult_T]
+	) -> Optional[tuple[int, int]]:
+		"""
+		Same as `get_iv`, but without `IntRange`s and validation.
+		`ev` and `mult` are `None` if unknown (`mult` is not used for HP).
+
+		Returns:
+			(min IV, max IV), which may be empty (min > max) just like in
+			`get_iv`, or `None` where `get_iv` raises `ValueError`.
+		"""
+		if type_ == StatType.HP:
+			min_ = max_ = val - 10 - lvl
+		elif mult is None:
+			# Ranges for both ends of `MULT_RANGE`, merged.
+			numerator, denominator = cls.MULT_RANGE.numerator, cls.MULT_RANGE.denominator
+			low, high = denominator*val, denominator*(val + 1) - 1
+			min_ = min((low + numerator.max - 1)//numerator.max, (low + numerator.min - 1)//numerator.min) - 5
+			max_ = max(high//numerator.max, high//numerator.min) - 5
+		elif mult != cls.DEFAULT_MULT:
+			low, high = mult.denominator*val, mult.denominator*(val + 1) - 1
+			min_ = (low + mult.numerator - 1)//mult.numerator - 5
+			max_ = high//mult.numerator - 5
+		else:
+			min_ = max_ = val - 5
+
+		lvl_mult = Fraction(lvl, LVL_NORM)
+		low, high = lvl_mult.denominator*min_, lvl_mult.denominator*(max_ + 1) - 1
+		min_ = (low + lvl_mult.numerator - 1)//lvl_mult.numerator
+		max_ = high//lvl_mult.numerator
+
+		if ev is None:
+			min_ -= 2*base + cls.EV_RANGE.max//4
+			max_ -= 2*base + cls.EV_RANGE.min//4
+		else:
+			min_ -= 2*base + ev//4
+			max_ -= 2*base + ev//4
+
+		if min_ > cls.IV_RANGE.max or max_ < cls.IV_RANGE.min:
+			return None
+
+		return max(min_, cls.IV_RANGE.min), min(max_, cls.IV_RANGE.max)
+
+	@classmethod
+	def get_iv_bounds_batch(
+		cls,
+		base: ArrayLike,
+		lvl: ArrayLike,
+		val: ArrayLike,
+		ev: ArrayLike,
+		mult_code: ArrayLike
+	) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+		"""
+		`get_iv_bounds` of many stats at once, with NumPy. Arguments are
+		integer arrays (or anything `numpy.asarray` accepts), broadcast
+		together: base stats, levels, values, EVs (negative if unknown) and
+		`MultCode`s. Nothing is validated.
+
+		Returns:
+			(min IVs, max IVs, possible): `possible` is `False` where
+			`get_iv_bounds` returns `None`; elsewhere ranges are the same,
+			including empty ones (min > max).
+		"""
+		import numpy as np
+
+		base, lvl, val, ev, mult_code = np.broadcast_arrays(
+			*(np.asarray(array, dtype=np.int64) for array in (base, lvl, val, ev, mult_code))
+		)
+
+		# Non-HP stats: undo the multiplier. Unknown multiplier gives ranges
+		# for both ends of `MULT_RANGE`, merged.
+		range_numerator, range_denominator = cls.MULT_RANGE.numerator, cls.MULT_RANGE.denominator
+		conditions = [mult_code == MultCode.INCREASED, mult_code == MultCode.DECREASED, mult_code == MultCode.UNKNOWN]
+		low_numerator = np.select(
+			conditions,
+			[cls.INCREASED_MULT.numerator, cls.DECREASED_MULT.numerator, range_numerator.max],
+			cls.DEFAULT_MULT
+		)
+		high_numerator = np.where(conditions[2], range_numerator.min, low_numerator)
+		denominator = np.select(
+			conditions,
+			[cls.INCREASED_MULT.denominator, cls.DECREASED_MULT.denominator, range_denominator],
+			cls.DEFAULT_MULT
+		)
+		low, high = denominator*val, denominator*(val + 1) - 1
+		min_ = np.minimum((low + low_numerator - 1)//low_numerator, (low + high_numerator - 1)//high_numerator) - 5
+		max_ = np.maximum(high//low_numerator, high//high_numerator) - 5
+
+		hp = mult_code == MultCode.HP
+		min_ = np.where(hp, val - 10 - lvl, min_)
+		max_ = np.where(hp, val - 10 - lvl, max_)
+
+		# Level multiplier is a reduced fraction, see `get_iv_bounds`.
+		lvl_gcd = np.gcd(lvl, LVL_NORM)
+		lvl_numerator, lvl_denominator = lvl//lvl_gcd, LVL_NORM//lvl_gcd
+		low, high = lvl_denominator*min_, lvl_denominator*(max_ + 1) - 1
+		min_ = (low + lvl_numerator - 1)//lvl_numerator
+		max_ = high//lvl_numerator
+
+		unknown_ev = ev < 0
+		min_ -= 2*base + np.where(unknown_ev, cls.EV_RANGE.max//4, ev//4)
+		max_ -= 2*base + np.where(unknown_ev, cls.EV_RANGE.min//4, ev//4)
+
+		possible = (min_ <= cls.IV_RANGE.max) & (max_ >= cls.IV_RANGE.min)
+		return np.maximum(min_, cls.IV_RANGE.min), np.minimum(max_, cls.IV_RANGE.max), possible
+
+	@classmethod
+	def get_iv_masks_batch(
+		cls,
+		base: ArrayLike,
+		lvl: ArrayLike,
+		val: ArrayLike,
+		ev: ArrayLike,
+		mult_code: ArrayLike
+	) -> np.ndarray:
+		"""
+		Same as `get_iv_bounds_batch`, but IVs are returned as `uint32` masks
+		(bits of `utils.IVMask`), 0 where values are impossible.
+		"""
+		import numpy as np
+
+		min_, max_, possible = cls.get_iv_bounds_batch(base, lvl, val, ev, mult_code)
+		high_shift = np.clip(max_ + 1, cls.IV_RANGE.min, cls.IV_RANGE.max + 1)
+		low_shift = np.clip(min_, cls.IV_RANGE.min, cls.IV_RANGE.max + 1)
+		masks = (np.int64(1) << high_shift) - (np.int64(1) << low_shift)
+		return np.where(possible & (low_shift < high_shift), masks, 0).astype(np.uint32)
+
 
 def main():
 	lvl = 78
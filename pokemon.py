@@ -2,17 +2,17 @@ from __future__ import annotations
 
 from copy import copy
 from dataclasses import dataclass
-from enum import Enum
-from typing import Dict, Union, Set, Optional
+from enum import Enum, pickle_by_enum_name
+from typing import Dict, Union, Optional
 
 import voluptuous as vlps
 
 from catch import CATCH_RATE_RANGE
 from characteristic import Characteristic, CharacteristicData
 from nature import Nature
-from pkmn_stat import Stat, BaseStats, Stats, GenStats, StatData, StatsData, InputStatsData_T, LVL_RANGE
+from pkmn_stat import Stat, BaseStats, Stats, GenStats, StatData, StatsData, InputStatsData_T, NatureMult_T, LVL_RANGE
 from pkmn_stat_type import StatType, GenStatType
-from utils import pretty_print, IntRange
+from utils import pretty_print, IntRange, IVMask
 
 
 class Species:
@@ -36,9 +36,15 @@ class Species:
 		return self._name
 
 
-NatureIVSets_T = Dict[StatType, Set[int]]
+NatureIVSets_T = Dict[StatType, IVMask]
 IVSets_T = Dict[Nature, NatureIVSets_T]
 
+# IVs allowed by characteristic remainders, see `Sample._characteristic_filter`.
+_REM_IV_MASKS = {
+	rem: IVMask.from_iterable(range(rem, Stat.IV_RANGE.max + 1, CharacteristicData.MOD))
+	for rem in range(CharacteristicData.MOD)
+}
+
 
 class Sample(Species):
 	MAX_EVS = 510
@@ -149,29 +155,27 @@ class Sample(Species):
 		highest_stat, rem = characteristic.highest_stat, characteristic.rem
 		# Find max-min value amongst all stats (except `highest_stat`) -
 		# `highest_stat` shouldn't be lower than that.
-		all_min_val = max(min(iv_set) for stat_type, iv_set in iv_sets.items() if stat_type != highest_stat)
-		iv_sets[highest_stat] = {
-			val
-			for val in iv_sets[highest_stat]
-			if (val >= all_min_val and val % CharacteristicData.MOD == rem)
-		}
+		all_min_val = max(iv_set.min for stat_type, iv_set in iv_sets.items() if stat_type != highest_stat)
+		iv_sets[highest_stat] &= (
+			IVMask.from_range(all_min_val, Stat.IV_RANGE.max) & _REM_IV_MASKS[rem]
+		)
 		if not iv_sets[highest_stat]:
 			raise ValueError("Stats have impossible values")
 
 		# Find max value of `highest_stat` - no stat should be higher.
-		highest_stat_max_val = max(iv_sets[highest_stat])
+		not_higher = IVMask.from_range(Stat.IV_RANGE.min, iv_sets[highest_stat].max)
 		for type_, set_ in iv_sets.items():
 			if type_ != highest_stat:
-				iv_sets[type_] = {
-					val
-					for val in iv_sets[type_]
-					if val <= highest_stat_max_val
-				}
+				iv_sets[type_] = set_ & not_higher
 				if not iv_sets[type_]:
 					raise ValueError("Stats have impossible values")
 
 		return iv_sets
 
+	@staticmethod
+	def _get_iv_mask(iv_range: IntRange) -> IVMask:
+		return IVMask.from_range(iv_range.min, iv_range.max)
+
 	@classmethod
 	def _get_iv_sets_with_nature(
 		cls,
@@ -179,7 +183,7 @@ class Sample(Species):
 		characteristic: Characteristic = None
 	) -> NatureIVSets_T:
 		iv_sets = {
-			stat_type: set(stat.get_iv())
+			stat_type: cls._get_iv_mask(stat.get_iv())
 			for stat_type, stat in stats.items()
 		}
 
@@ -206,25 +210,33 @@ class Sample(Species):
 		for stat_type, stat in self._stats.items():
 			mult_iv_sets = {}
 			if stat_type == StatType.HP:
-				mult_iv_sets[None] = set(stat.get_iv())
+				mult_iv_sets[None] = self._get_iv_mask(stat.get_iv())
 			else:
 				for mult in Stat.POSSIBLE_MULTS:
 					try:
 						iv_range = stat.get_iv(mult=mult)
 					except ValueError:
 						continue
-					mult_iv_sets[mult] = set(iv_range)
+					mult_iv_sets[mult] = self._get_iv_mask(iv_range)
 
 				if not mult_iv_sets:
 					raise ValueError(f"Calculated {stat_type.name} IVs are impossible")
 
 			pre_iv_sets[stat_type] = mult_iv_sets
 
-		# Define possible natures.
+		return self._get_natures_iv_sets(pre_iv_sets, self._characteristic)
+
+	@classmethod
+	def _get_natures_iv_sets(
+		cls,
+		pre_iv_sets: Dict[StatType, Dict[Optional[NatureMult_T], IVMask]],
+		characteristic: Optional[Characteristic]
+	) -> IVSets_T:
+		"""Define possible natures, given IV sets for different nature mults."""
 		iv_sets = {}
 		for nature in Nature:
 			# All simple natures are equivalent if characteristic is not defined.
-			if nature.is_simple() and self._characteristic is None and nature != Nature.DEFAULT:
+			if nature.is_simple() and characteristic is None and nature != Nature.DEFAULT:
 				continue
 
 			try:
@@ -235,9 +247,9 @@ class Sample(Species):
 			except KeyError:
 				continue
 
-			if self._characteristic is not None:
+			if characteristic is not None:
 				try:
-					nature_iv_sets = self._characteristic_filter(nature_iv_sets, self._characteristic)
+					nature_iv_sets = cls._characteristic_filter(nature_iv_sets, characteristic)
 				except ValueError:
 					continue
 
@@ -248,6 +260,66 @@ class Sample(Species):
 
 		return iv_sets
 
+	@classmethod
+	def calc_iv_sets(
+		cls,
+		base_stats: BaseStats,
+		lvl: int,
+		stats: Dict[StatType, tuple[int, int]],  # (value, ev)
+		nature: Optional[Nature] = None,
+		characteristic: Optional[Characteristic] = None
+	) -> Optional[IVSets_T]:
+		"""
+		Same as `get_iv_sets` of a sample with such `stats`, but way faster:
+		nothing is validated and all the math is done with plain integers,
+		see `Stat.get_iv_bounds`. Arguments should be validated by caller.
+
+		Returns `None` where `Sample` would raise `ValueError`.
+		"""
+		# Values should be possible, see `Stat.__init__`.
+		for stat_type, (value, ev) in stats.items():
+			mult = None if nature is None else Stat.get_mult(stat_type, nature)
+			min_value, max_value = Stat.calc_val_bounds(stat_type, base_stats[stat_type], lvl, ev, mult)
+			if not min_value <= value <= max_value:
+				return None
+
+		if nature is not None:
+			iv_sets = {}
+			for stat_type, (value, ev) in stats.items():
+				bounds = Stat.get_iv_bounds(
+					stat_type, base_stats[stat_type], lvl, value, ev, Stat.get_mult(stat_type, nature)
+				)
+				if bounds is None:
+					return None
+				iv_sets[stat_type] = IVMask.from_range(*bounds)
+
+			if characteristic is not None:
+				try:
+					iv_sets = cls._characteristic_filter(iv_sets, characteristic)
+				except ValueError:
+					return None
+
+			return {nature: iv_sets}
+
+		pre_iv_sets = {}
+		for stat_type, (value, ev) in stats.items():
+			mults = (None,) if stat_type == StatType.HP else Stat.POSSIBLE_MULTS
+			mult_iv_sets = {}
+			for mult in mults:
+				bounds = Stat.get_iv_bounds(stat_type, base_stats[stat_type], lvl, value, ev, mult)
+				if bounds is not None:
+					mult_iv_sets[mult] = IVMask.from_range(*bounds)
+
+			if not mult_iv_sets:
+				return None
+
+			pre_iv_sets[stat_type] = mult_iv_sets
+
+		try:
+			return cls._get_natures_iv_sets(pre_iv_sets, characteristic)
+		except ValueError:
+			return None
+
 
 class Pokemon(Enum):
 	MAGIKARP = Species(name="Magikarp", catch_rate=255, base_stats={
@@ -421,6 +493,8 @@ class Pokemon(Enum):
 		StatType.SPEED: 50
 	})
 
+	__reduce_ex__ = pickle_by_enum_name
+
 
 Species_T = Species | Pokemon
 
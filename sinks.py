@@ -0,0 +1,299 @@
+import csv
+import io
+import json
+import sys
+from abc import ABC, abstractmethod
+from collections.abc import Container
+from pathlib import Path
+from typing import Optional, TextIO, Literal, Mapping
+from typing_extensions import Self
+
+import iv_calc
+from iv_calc import CalcedIVSets_T
+from iv_calc_ods import ObsSample, pprint_sample_iv_sets, pprint_filtered_labels
+from pkmn_stat_type import StatType, GenStatType
+
+type SinkFormat_T = Literal["terminal", "jsonl", "csv"]
+# Comparison value of a sample: number or formatted range, see
+# `comparator.process_compare_ods`.
+type StatValues_T = Mapping[GenStatType, float | str]
+
+# Results are written in big chunks rather than line by line.
+BUFFER_SIZE = 1 << 16
+
+
+class Sink(ABC):
+    """
+    Destination of results of `iv_calc_ods.process_ods_with_filter` and
+    `comparator.process_compare_ods`.
+
+    Records are written to a buffered stream as soon as they are known, and
+    flushed on `close`. Sink can be used as a context manager.
+    """
+    def __init__(self, file: TextIO, owned: bool = False):
+        """`file` is closed together with the sink if it's `owned`."""
+        self._file = file
+        self._owned = owned
+
+    @abstractmethod
+    def write_filtered(self, label: Optional[str], ref_label: Optional[str]) -> None:
+        """Sample `label` was filtered out, because it can't be better than `ref_label`."""
+
+    @abstractmethod
+    def write_sample(self, obs_sample: ObsSample, iv_sets: CalcedIVSets_T) -> None:
+        ...
+
+    @abstractmethod
+    def write_ranked(
+        self,
+        rank: int,
+        obs_sample: ObsSample,
+        iv_sets: CalcedIVSets_T,
+        stats: StatValues_T,
+    ) -> None:
+        """Sample took `rank` place (starting from 1) in comparison."""
+
+    @abstractmethod
+    def write_reference(self, label: Optional[str], stats: StatValues_T) -> None:
+        """Reference sample of comparison."""
+
+    def close(self) -> None:
+        if self._owned:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+class TerminalSink(Sink):
+    """Human-readable colored output, see `iv_calc.pprint_iv_sets`."""
+    def __init__(
+        self,
+        file: TextIO,
+        owned: bool = False,
+        color_mode: iv_calc.ColorMode = "max",
+        important_stat_types: Optional[Container[StatType]] = None,
+        print_only_important: bool = True,
+    ):
+        super().__init__(file, owned)
+        self._color_mode = color_mode
+        self._important_stat_types = important_stat_types
+        self._print_only_important = print_only_important
+        # If the "Filtered samples" section is not finished yet.
+        self._filtered_open = False
+
+    def write_filtered(self, label: Optional[str], ref_label: Optional[str]) -> None:
+        if not self._filtered_open:
+            pprint_filtered_labels([(label, ref_label)], file=self._file)
+            self._filtered_open = True
+        else:
+            print(f"{label} ≤ {ref_label}", file=self._file)
+
+    def write_sample(self, obs_sample: ObsSample, iv_sets: CalcedIVSets_T) -> None:
+        self._close_filtered()
+        pprint_sample_iv_sets(
+            obs_sample,
+            iv_sets,
+            self._color_mode,
+            self._important_stat_types,
+            self._print_only_important,
+            file=self._file,
+        )
+        print(file=self._file)
+
+    def write_ranked(
+        self,
+        rank: int,
+        obs_sample: ObsSample,
+        iv_sets: CalcedIVSets_T,
+        stats: StatValues_T,
+    ) -> None:
+        self._close_filtered()
+        print(f"#{rank} {obs_sample['label']}: {self._stats_str(stats)}", file=self._file)
+
+    def write_reference(self, label: Optional[str], stats: StatValues_T) -> None:
+        self._close_filtered()
+        print(f"REFERENCE {label}: {self._stats_str(stats)}", file=self._file)
+
+    def _close_filtered(self) -> None:
+        if self._filtered_open:
+            print(file=self._file)
+            self._filtered_open = False
+
+    @staticmethod
+    def _stats_str(stats: StatValues_T) -> str:
+        return ", ".join(f"{stat_type.name}={value}" for stat_type, value in stats.items())
+
+
+def _iv_sets_record(iv_sets: CalcedIVSets_T) -> dict[str, dict[str, object]]:
+    return {
+        stat_type.name: {
+            "ivs": list(calced_iv_set.values),
+            "update_lvl": calced_iv_set.suggestion.update_lvl,
+            "delta_ev": calced_iv_set.suggestion.delta_ev,
+            "exact_delta_ev": calced_iv_set.suggestion.exact_delta_ev,
+        }
+        for stat_type, calced_iv_set in iv_sets.items()
+    }
+
+
+def _sample_record(obs_sample: ObsSample) -> dict[str, object]:
+    nature, characteristic = obs_sample["nature"], obs_sample["characteristic"]
+    return {
+        "label": obs_sample["label"],
+        "pokemon": obs_sample["spec"].name,
+        "nature": None if nature is None else nature.name,
+        "characteristic": None if characteristic is None else characteristic.name,
+    }
+
+
+def _stats_record(stats: StatValues_T) -> dict[str, float | str]:
+    return {stat_type.name: value for stat_type, value in stats.items()}
+
+
+class JsonlSink(Sink):
+    """
+    One JSON object per line, with "kind" of the record:
+
+    * "filtered":  label, ref_label;
+    * "sample":    label, pokemon, nature, characteristic and iv_sets:
+                   {stat type: {ivs, update_lvl, delta_ev, exact_delta_ev}};
+    * "ranked":    rank, stats: {gen stat type: value}, and everything from
+                   "sample";
+    * "reference": label, stats.
+    """
+    def write_filtered(self, label: Optional[str], ref_label: Optional[str]) -> None:
+        self._write({"kind": "filtered", "label": label, "ref_label": ref_label})
+
+    def write_sample(self, obs_sample: ObsSample, iv_sets: CalcedIVSets_T) -> None:
+        self._write({"kind": "sample", **_sample_record(obs_sample), "iv_sets": _iv_sets_record(iv_sets)})
+
+    def write_ranked(
+        self,
+        rank: int,
+        obs_sample: ObsSample,
+        iv_sets: CalcedIVSets_T,
+        stats: StatValues_T,
+    ) -> None:
+        self._write({
+            "kind": "ranked",
+            "rank": rank,
+            **_sample_record(obs_sample),
+            "stats": _stats_record(stats),
+            "iv_sets": _iv_sets_record(iv_sets),
+        })
+
+    def write_reference(self, label: Optional[str], stats: StatValues_T) -> None:
+        self._write({"kind": "reference", "label": label, "stats": _stats_record(stats)})
+
+    def _write(self, record: dict[str, object]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write("\n")
+
+
+class CsvSink(Sink):
+    """
+    CSV with a header and one row per record. All kinds of records (see
+    `JsonlSink`) share the same columns: KIND, RANK, LABEL, POKEMON, NATURE,
+    CHARACTERISTIC, REFERENCE (for filtered samples), all `GenStatType`s,
+    then IV set, update level, delta EV and exact delta EV of every
+    `StatType`. Columns which don't make sense for a record are empty.
+    """
+    _COLUMNS = (
+        "KIND", "RANK", "LABEL", "POKEMON", "NATURE", "CHARACTERISTIC", "REFERENCE",
+        *(stat_type.name for stat_type in GenStatType),
+        *(
+            column
+            for stat_type in StatType
+            for column in (
+                f"{stat_type.name} IVS",
+                f"{stat_type.name} UPDATE LVL",
+                f"{stat_type.name} DELTA EV",
+                f"{stat_type.name} EXACT DELTA EV",
+            )
+        ),
+    )
+
+    def __init__(self, file: TextIO, owned: bool = False):
+        super().__init__(file, owned)
+        self._writer = csv.DictWriter(file, self._COLUMNS)
+        self._writer.writeheader()
+
+    def write_filtered(self, label: Optional[str], ref_label: Optional[str]) -> None:
+        self._writer.writerow({"KIND": "FILTERED", "LABEL": label, "REFERENCE": ref_label})
+
+    def write_sample(self, obs_sample: ObsSample, iv_sets: CalcedIVSets_T) -> None:
+        self._writer.writerow({"KIND": "SAMPLE", **self._sample_row(obs_sample, iv_sets)})
+
+    def write_ranked(
+        self,
+        rank: int,
+        obs_sample: ObsSample,
+        iv_sets: CalcedIVSets_T,
+        stats: StatValues_T,
+    ) -> None:
+        self._writer.writerow({
+            "KIND": "RANKED",
+            "RANK": rank,
+            **self._sample_row(obs_sample, iv_sets),
+            **_stats_record(stats),
+        })
+
+    def write_reference(self, label: Optional[str], stats: StatValues_T) -> None:
+        self._writer.writerow({"KIND": "REFERENCE", "LABEL": label, **_stats_record(stats)})
+
+    @staticmethod
+    def _sample_row(obs_sample: ObsSample, iv_sets: CalcedIVSets_T) -> dict[str, object]:
+        row = {name.upper(): value for name, value in _sample_record(obs_sample).items()}
+        for stat_type, calced_iv_set in iv_sets.items():
+            row[f"{stat_type.name} IVS"] = iv_calc.get_iv_set_str(calced_iv_set.values)
+            row[f"{stat_type.name} UPDATE LVL"] = calced_iv_set.suggestion.update_lvl
+            row[f"{stat_type.name} DELTA EV"] = calced_iv_set.suggestion.delta_ev
+            row[f"{stat_type.name} EXACT DELTA EV"] = calced_iv_set.suggestion.exact_delta_ev
+        return row
+
+
+_SINK_TYPES: dict[SinkFormat_T, type[Sink]] = {
+    "terminal": TerminalSink,
+    "jsonl": JsonlSink,
+    "csv": CsvSink,
+}
+
+
+def open_sink(
+    fmt: SinkFormat_T,
+    path: Optional[str | Path] = None,
+    **kwargs,
+) -> Sink:
+    """
+    Open a sink of `fmt` writing to `path`, or to the standard output if it's
+    `None`. Either way, output is buffered: close the sink to flush it.
+    `kwargs` are passed to the sink, e.g. `color_mode` of `TerminalSink`.
+
+    Raises:
+        OSError:
+            The file cannot be opened.
+    """
+    sink_type = _SINK_TYPES[fmt]
+    if path is not None:
+        file = Path(path).expanduser().open("w", encoding="utf-8", newline="", buffering=BUFFER_SIZE)
+        return sink_type(file, owned=True, **kwargs)
+
+    try:
+        fileno = sys.stdout.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        # Replaced standard output, e.g. `io.StringIO`.
+        return sink_type(sys.stdout, **kwargs)
+
+    sys.stdout.flush()
+    file = open(
+        fileno, "w",
+        encoding=sys.stdout.encoding, newline="" if fmt == "csv" else None,
+        buffering=BUFFER_SIZE, closefd=False,
+    )
+    return sink_type(file, owned=True, **kwargs)
@@ -6,7 +6,7 @@ from frozendict import frozendict
 from functools import partial
 import json_utils
 from numbers import Number
-from typing import Iterable, TypeVar, Generic
+from typing import Iterable, Iterator, TypeVar, Generic
 from typing_extensions import Self
 from types import UnionType, GenericAlias
 
@@ -473,6 +473,95 @@ def multiplier_range_frac(mult: FracOrRange_T, prod: IntOrRange_T) -> IntRange:
 	)
 
 
+class IVMask:
+	"""
+	Immutable set of small non-negative integers (IVs), stored as a bit mask:
+	bit `i` is set if `i` is in the set.
+
+	Intersection, union, size, min and max are single integer operations.
+	Iteration yields values in ascending order.
+	"""
+	__slots__ = "_bits",
+
+	def __init__(self, bits: int = 0):
+		if bits < 0:
+			raise ValueError(f"Mask should be non-negative, got {bits}")
+		self._bits = bits
+
+	@classmethod
+	def from_range(cls, min_: int, max_: int) -> IVMask:
+		"""Values in [min_, max_], empty if `min_ > max_`."""
+		if min_ > max_:
+			return cls()
+		return cls(((1 << (max_ - min_ + 1)) - 1) << min_)
+
+	@classmethod
+	def from_iterable(cls, values: Iterable[int]) -> IVMask:
+		bits = 0
+		for value in values:
+			bits |= 1 << value
+		return cls(bits)
+
+	@property
+	def bits(self) -> int:
+		return self._bits
+
+	@property
+	def min(self) -> int:
+		if not self._bits:
+			raise ValueError("Empty mask has no min")
+		return (self._bits & -self._bits).bit_length() - 1
+
+	@property
+	def max(self) -> int:
+		if not self._bits:
+			raise ValueError("Empty mask has no max")
+		return self._bits.bit_length() - 1
+
+	def __and__(self, other: IVMask) -> IVMask:
+		if not isinstance(other, IVMask):
+			return NotImplemented
+		return IVMask(self._bits & other._bits)
+
+	def __or__(self, other: IVMask) -> IVMask:
+		if not isinstance(other, IVMask):
+			return NotImplemented
+		return IVMask(self._bits | other._bits)
+
+	def __len__(self) -> int:
+		return self._bits.bit_count()
+
+	def __bool__(self) -> bool:
+		return bool(self._bits)
+
+	def __contains__(self, value: int) -> bool:
+		return value >= 0 and bool(self._bits >> value & 1)
+
+	def __iter__(self) -> Iterator[int]:
+		bits = self._bits
+		while bits:
+			low = bits & -bits
+			yield low.bit_length() - 1
+			bits ^= low
+
+	def __eq__(self, other: object) -> bool:
+		if not isinstance(other, IVMask):
+			return NotImplemented
+		return self._bits == other._bits
+
+	def __hash__(self) -> int:
+		return hash(self._bits)
+
+	def __reduce__(self):
+		return self.__class__, (self._bits,)
+
+	def __repr__(self) -> str:
+		return f"{self.__class__.__name__}({list(self)})"
+
+	def __str__(self) -> str:
+		return f"{{{', '.join(map(str, self))}}}"
+
+
 colored = partial(termcolor.colored, force_color=True)
 
 